@@ -0,0 +1,134 @@
+# --- AI AÇIKLAMA: PROMPT VE ORTAK ÖNBELLEK ---
+# Aynı soru için üretilen açıklama tüm kullanıcılar arasında paylaşılır.
+# Anahtar = pasaj + soru + şıklar + cevap + prompt sürümü (+ model) özeti.
+# İki katman: süreç içi LRU (anında) ve depolamadaki ai_cache (kalıcı, ortak).
+# Bunların önünde, pregen_explanations.py ile önceden üretilmiş deneme yanı dosyaları (.ai.jsonl) durur.
+import os
+import hashlib
+import json
+
+from helpers import LRUCache
+
+MODEL = "gpt-4o"
+# Prompt metni değişirse artırın; eski önbellek kayıtları kendiliğinden devre dışı kalır
+PROMPT_VERSION = 1
+
+
+def build_prompt(passage, question, options, correct_answer):
+    # Pasaj Kontrolü ve Dinamik Prompt
+    is_passage = passage and len(passage.strip()) > 5
+    context_text = f"--- PASAJ ---\n{passage}\n" if is_passage else ""
+    
+    role_instruction = (
+        "Verilen pasajı ve soruyu analiz ederek doğru cevabın pasajdaki dayanağını göster." 
+        if is_passage else 
+        "Verilen gramer/kelime sorusunu analiz et, kuralı veya kelime anlamını açıkla."
+    )
+
+    prompt = f"""
+    Sen uzman bir YÖKDİL/YDS İngilizce eğitmenisin.
+    Giriş veya sonuç cümleleri (Tabii, Umarım vb.) kullanma. Doğrudan analize baş.
+    {role_instruction}
+    
+    {context_text}
+    --- SORU ---
+    {question}
+    
+    --- SEÇENEKLER ---
+    {options}
+    
+    --- DOĞRU CEVAP ---
+    {correct_answer}
+    
+    Analizinde şunları yap:
+    1. Doğru cevabın neden doğru olduğunu (pasaj kanıtı veya gramer kuralı) açıkla.
+    2. Yanlış şıkların neden elendiğini (çeldirici mantığı) belirt.
+    3. Önemli 'akademik' kelimelerin Türkçe karşılıklarını ve eş anlamlılarını liste şeklinde ver.
+    4. Soru tipine özel bir 'sınav ipucu' (trick) ekle.
+    
+    Lütfen anlatımını samimi ve öğretici tut.
+    """
+    return prompt
+
+
+def iter_completion(client, prompt):
+    # Akışlı (stream=True) çağrı; sadece metin parçalarını döndürür
+    stream = client.chat.completions.create(
+        model=MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        stream=True,
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+def explanation_key(passage, question, options, correct_answer):
+    payload = json.dumps([PROMPT_VERSION, MODEL, passage or "", question or "", list(options), correct_answer],
+                         ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# --- DENEME YANI DOSYALARI (<deneme>.ai.jsonl) ---
+SIDECAR_SUFFIX = ".ai.jsonl"
+
+def sidecar_path(exam_path):
+    return exam_path[:-len(".json")] + SIDECAR_SUFFIX
+
+def read_sidecar(path):
+    # Aynı soru için son kayıt geçerlidir
+    records = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # yarım yazılmış son satır
+                records[rec["q"]] = rec
+    return records
+
+def load_sidecar_explanations(exam_path):
+    # Uygulama tarafı: geçerli anahtarlı, başarılı kayıtlar {anahtar: metin}
+    return {r["key"]: r["text"] for r in read_sidecar(sidecar_path(exam_path)).values()
+            if r.get("text") and r.get("prompt_version") == PROMPT_VERSION}
+
+
+class ExplanationCache:
+    def __init__(self, storage=None, maxsize=512, static=None):
+        self.local = LRUCache(maxsize)
+        self.storage = storage
+        # Önceden üretilmiş açıklamalar {anahtar: metin}, hiç API/Firestore çağrısı gerektirmez
+        self.static = static or {}
+
+    def get(self, key):
+        text = self.static.get(key)
+        if text is not None:
+            return text
+        text = self.local.get(key)
+        if text is not None or self.storage is None:
+            return text
+        try:
+            record = self.storage.get_shared_explanation(key)
+        except Exception:
+            return None
+        text = (record or {}).get("text")
+        if text:
+            self.local.put(key, text)
+            return text
+        return None
+
+    def put(self, key, text):
+        self.local.put(key, text)
+        if self.storage is not None:
+            try:
+                self.storage.put_shared_explanation(key, {
+                    "text": text,
+                    "model": MODEL,
+                    "prompt_version": PROMPT_VERSION,
+                })
+            except Exception:
+                pass
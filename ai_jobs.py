@@ -0,0 +1,140 @@
+# --- AI İŞ KUYRUĞU ---
+# AI analizleri Streamlit betik thread'inde değil, süreç genelindeki sınırlı bir işçi havuzunda çalışır.
+# - Aynı soru için aynı anda gelen istekler tek bir çağrıda birleştirilir (anahtar = explanation_key)
+# - Tek bir OpenAI istemcisi tekrar kullanılır
+# - Token-bucket ile istek hızı sınırlanır, zaman aşımı ve yeniden deneme vardır
+# - Cevap akışlı alınır; sayfa sonraki yenilemelerde kısmi metni ve durumu gösterebilir
+# Yerel sahte bir OpenAI sunucusuyla denemek için OPENAI_BASE_URL ortam değişkeni yeterlidir.
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import perf
+from ai_explain import build_prompt, explanation_key, iter_completion
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AIJob:
+    def __init__(self, key):
+        self.key = key
+        self.status = QUEUED
+        self.parts = []
+        self.error = None
+        self.attempts = 0
+        self.finished_at = None
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+
+class AIJobQueue:
+    def __init__(self, client_factory, cache, workers=4, rate=1.0, burst=5,
+                 timeout=60.0, retries=2, keep_finished=600):
+        self._client_factory = client_factory
+        self._client = None
+        self._cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-job")
+        self._bucket = TokenBucket(rate, burst)
+        self._timeout = timeout
+        self._retries = retries
+        self._keep_finished = keep_finished
+        self._jobs = {}
+        self._lock = threading.Lock()
+        # İstemci kurulumu (openai içe aktarma dahil) iş tablosunun kilidini tutmasın
+        self._client_lock = threading.Lock()
+
+    def _get_client(self):
+        # Tüm işler için tek istemci (bağlantı havuzu paylaşılır)
+        with self._client_lock:
+            if self._client is None:
+                client = self._client_factory()
+                if client is None:
+                    raise RuntimeError("OPENAI_API_KEY bulunamadı! (.env veya Cloud Secrets kontrol edin.)")
+                self._client = client.with_options(timeout=self._timeout, max_retries=0)
+            return self._client
+
+    def submit(self, passage, question, options, correct_answer):
+        key = explanation_key(passage, question, options, correct_answer)
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(key)
+            if job is not None and job.status != FAILED:
+                return job
+        # Önbellek (Firestore ai_cache'e gidebilir) kilit dışında sorulur; diğer oturumlar beklemez
+        cached = self._cache.get(key)
+        with self._lock:
+            # Bu arada başka oturum aynı işi başlatmış olabilir
+            job = self._jobs.get(key)
+            if job is not None and job.status != FAILED:
+                return job
+            job = AIJob(key)
+            if cached:
+                job.parts = [cached]
+                job.status = DONE
+                job.finished_at = time.monotonic()
+                self._jobs[key] = job
+                return job
+            self._jobs[key] = job
+        prompt = build_prompt(passage, question, options, correct_answer)
+        self._pool.submit(self._run, job, prompt)
+        return job
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def _prune(self):
+        now = time.monotonic()
+        for key in [k for k, j in self._jobs.items()
+                    if j.finished_at is not None and now - j.finished_at > self._keep_finished]:
+            del self._jobs[key]
+
+    def _run(self, job, prompt):
+        job.status = RUNNING
+        for attempt in range(self._retries + 1):
+            job.attempts = attempt + 1
+            job.parts = []
+            try:
+                client = self._get_client()
+                self._bucket.acquire()
+                with perf.span("ai.completion"):
+                    for delta in iter_completion(client, prompt):
+                        job.parts.append(delta)
+                text = job.text
+                if not text:
+                    raise RuntimeError("Boş cevap")
+                self._cache.put(job.key, text)
+                job.error = None
+                job.status = DONE
+                job.finished_at = time.monotonic()
+                return
+            except Exception as e:
+                job.error = str(e)
+                if attempt < self._retries:
+                    time.sleep(2 ** attempt)
+        job.parts = []
+        job.status = FAILED
+        job.finished_at = time.monotonic()
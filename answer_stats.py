@@ -0,0 +1,118 @@
+# --- SORU ZORLUK İSTATİSTİKLERİ ---
+# Her cevap değişikliği (deneme, soru, şık) sayaçlarına +1 / -1 olarak yansır; kullanıcı başına son cevap sayılır.
+# Süreçteki tüm oturumların değişiklikleri toplanıp belirli aralıkla rastgele bir parça belgesine yazılır
+# (answer_stats/{deneme}/shards/{n}), böylece binlerce öğrenci aynı belgeye yazmaz.
+# Ekran parçaları hiç okumaz: önceden hesaplanmış özet belgesi (answer_stats/{deneme}) tek okumayla gelir.
+# Tüm depolama işleri arka planda yapılır, öğrencinin tıklaması beklemez:
+# - özet süreç içinde paylaşılır, süresi dolunca arka planda yeniden okunur (o sırada eski özet gösterilir)
+# - sayaçlar yazıldıktan sonra, özet SUMMARY_MAX_AGE'den eskiyse parçalar (sabit NUM_SHARDS belge,
+#   kullanıcı sayısından bağımsız) toplanıp özet aynı arka plan thread'inde yeniden yazılır
+import time
+import random
+import threading
+
+from helpers import add_counts
+from user_state import WriteBehind
+
+NUM_SHARDS = 10
+# Özet bu süreden eskiyse parçalardan yeniden hesaplanır
+SUMMARY_MAX_AGE = 300.0
+# Okunan özet süreç içinde bu kadar paylaşılır
+CACHE_TTL = 60.0
+
+
+EMPTY = {"updated_at": 0, "questions": {}}
+
+
+def answer_change(q_no, old, new):
+    deltas = {new: 1}
+    if old:
+        deltas[old] = -1
+    return {str(q_no): deltas}
+
+
+def summarize(shards, questions):
+    counts = {}
+    for shard in shards:
+        add_counts(counts, shard)
+    summary = {}
+    for q_no, letters in counts.items():
+        info = questions.get(q_no)
+        if info is None:
+            continue
+        letters = {k: n for k, n in letters.items() if n > 0}
+        answered = sum(letters.values())
+        if not answered:
+            continue
+        wrong = [(n, k) for k, n in letters.items() if k != info["answer"]]
+        summary[q_no] = {
+            "answered": answered,
+            "correct": letters.get(info["answer"], 0),
+            "counts": letters,
+            "top_wrong": max(wrong)[1] if wrong else None,
+        }
+    return {"updated_at": time.time(), "questions": summary}
+
+
+class AnswerStats:
+    def __init__(self, storage, interval=10.0, shards=NUM_SHARDS):
+        self.storage = storage
+        self.shards = shards
+        # Deneme başına bekleyen sayaç farkları toplanarak birleştirilir
+        self.writer = WriteBehind(self._write, interval=interval, merge=add_counts)
+        # deneme -> (yenileme zamanı, özet); deneme -> cevap anahtarı (özeti yeniden hesaplamak için)
+        self._cache = {}
+        self._questions = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _write(self, deneme_id, deltas):
+        # Yazıcı thread'inde: sayaçları bir parçaya ekle, özet eskiyse yeniden hesapla
+        self.storage.increment_answer_stats(deneme_id, random.randrange(self.shards), deltas)
+        with self._lock:
+            questions = self._questions.get(deneme_id)
+            cached = self._cache.get(deneme_id)
+        if questions is not None and (cached is None or cached[1].get("updated_at", 0) + SUMMARY_MAX_AGE < time.time()):
+            # Sayaçlar yazıldı; özet hatası yazıcının yeniden denemesine (çift sayıma) yol açmasın
+            try:
+                self.rebuild(deneme_id, questions)
+            except Exception:
+                pass
+
+    def record(self, deneme_id, q_no, old, new):
+        self.writer.put(deneme_id, answer_change(q_no, old, new))
+
+    def summary(self, deneme_id, questions):
+        # Her zaman bellekten döner (ilk çağrıda boş); süresi dolan özet arka planda tazelenir
+        with self._lock:
+            self._questions[deneme_id] = questions
+            hit = self._cache.get(deneme_id)
+            stale = hit is None or hit[0] <= time.monotonic()
+            if stale and deneme_id not in self._refreshing:
+                self._refreshing.add(deneme_id)
+                threading.Thread(target=self._refresh, args=(deneme_id, questions),
+                                 name="answer-stats", daemon=True).start()
+        return hit[1] if hit is not None else EMPTY
+
+    def _refresh(self, deneme_id, questions):
+        try:
+            doc = self.storage.get_answer_stats(deneme_id)
+            if doc is None:
+                doc = self.rebuild(deneme_id, questions)
+            else:
+                self._remember(deneme_id, doc)
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(deneme_id)
+
+    def _remember(self, deneme_id, doc):
+        with self._lock:
+            self._cache[deneme_id] = (time.monotonic() + CACHE_TTL, doc)
+
+    def rebuild(self, deneme_id, questions):
+        doc = summarize(self.storage.get_answer_stat_shards(deneme_id), questions)
+        self.storage.put_answer_stats(deneme_id, doc)
+        self._remember(deneme_id, doc)
+        return doc
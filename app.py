@@ -1,92 +1,250 @@
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import os
-import json
 import random
-import firebase_admin
-from firebase_admin import credentials, firestore, auth
-import openai
-from openai import OpenAI
 from dotenv import load_dotenv
 load_dotenv()
 from streamlit_cookies_controller import CookieController # Yeni kütüphane
 import time
+import streamlit.components.v1 as components
 from st_keyup import st_keyup
 
-from gtts import gTTS
-import io
-
-import re
-
+import uuid
+import functools
+from collections import deque
+
+from user_state import UserDocMirror, WriteBehind, flush_on_session_end
+from tts_cache import AudioCache
+from ai_explain import ExplanationCache
+from ai_jobs import AIJobQueue, QUEUED, DONE, FAILED
+from storage import open_storage, DeferredStorage, AccountNotFound, WrongPassword
+import session_token
+from exam_session import ExamAnswerLog
+from answer_stats import AnswerStats
+from learned_words import LearnedSet, BITS_FIELD, MIGRATED_FIELD, migrate_subcollection
+from content_watch import ContentWatcher
+import srs
+import perf
+
+@st.cache_resource(show_spinner=False)
+def get_audio_cache():
+    # Telaffuz sesleri diskte + bellekte tutulur (python tts_cache.py ile önceden üretilebilir)
+    return AudioCache()
 
 def play_tts(text, lang='en'):
-    tts = gTTS(text=text, lang=lang)
-    fp = io.BytesIO()
-    tts.write_to_fp(fp)
-    st.audio(fp, format='audio/mp3', autoplay=True)
+    with perf.span("tts.get"):
+        audio = get_audio_cache().get(text, lang)
+    st.audio(audio, format='audio/mp3', autoplay=True)
+
+# Yazma alıştırması için tarayıcı tarafı bileşen (components/typing_trainer/index.html)
+typing_trainer = components.declare_component(
+    "typing_trainer", path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "typing_trainer")
+)
 
 controller = CookieController();
 # --- 1. FIREBASE VE AYARLAR ---
-if not firebase_admin._apps:
-    try:
-        # Önce Cloud Secrets'ı dene (İnternetteyken burası çalışır)
-        if hasattr(st, "secrets") and "FIREBASE_JSON" in st.secrets:
-            key_dict = dict(st.secrets["FIREBASE_JSON"])
-            cred = credentials.Certificate(key_dict)
-        else:
-            # Lokaldesin demektir, dosyaya bak
+# firebase_admin / openai / gtts ağır modüllerdir; sadece ilk kullanıldıklarında içe aktarılır.
+# Başlangıç süresi dökümü için: python startup_report.py
+def init_firebase():
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    if not firebase_admin._apps:
+        try:
+            # Önce Cloud Secrets'ı dene (İnternetteyken burası çalışır)
+            if hasattr(st, "secrets") and "FIREBASE_JSON" in st.secrets:
+                key_dict = dict(st.secrets["FIREBASE_JSON"])
+                cred = credentials.Certificate(key_dict)
+            else:
+                # Lokaldesin demektir, dosyaya bak
+                cred = credentials.Certificate("serviceAccountKey.json")
+        except Exception:
+            # Eğer secrets hiç yoksa veya hata verirse direkt dosyaya düş
             cred = credentials.Certificate("serviceAccountKey.json")
-    except Exception:
-        # Eğer secrets hiç yoksa veya hata verirse direkt dosyaya düş
-        cred = credentials.Certificate("serviceAccountKey.json")
-        
-    firebase_admin.initialize_app(cred)
-
-db = firestore.client()
+            
+        firebase_admin.initialize_app(cred)
+    return firestore.client()
 
-current_dir = os.path.dirname(os.path.abspath(__file__))
-JSON_FOLDER = os.path.join(current_dir, "YOKDIL_JSON_CIKTILAR")
-WORDS_FILE = os.path.join(current_dir, "yokdil_words.json")
-GRAMMAR_FILE = os.path.join(current_dir, "grammar_notes.json")
+def get_firebase_web_api_key():
+    # Şifre doğrulaması için web API anahtarı (Cloud: Secrets, Lokal: .env)
+    try:
+        if "FIREBASE_WEB_API_KEY" in st.secrets:
+            return str(st.secrets["FIREBASE_WEB_API_KEY"])
+    except Exception:
+        pass
+    return os.getenv("FIREBASE_WEB_API_KEY")
+
+@st.cache_resource(show_spinner=False)
+def get_storage():
+    # YOKDIL_STORAGE=firestore (varsayılan) | sqlite | memory
+    backend = os.getenv("YOKDIL_STORAGE", "firestore")
+    if backend == "firestore":
+        # Firebase arka planda başlar; giriş ekranı beklemeden çizilir, ilk depolama çağrısı hazır olmasını bekler
+        # (Secrets arka plan thread'inden okunmaz, anahtar burada alınır)
+        web_api_key = get_firebase_web_api_key()
+        return perf.Traced(DeferredStorage(lambda: open_storage(backend, init_firebase(), web_api_key)), "storage")
+    return perf.Traced(open_storage(backend), "storage")
+
+storage = get_storage()
+
+# --- 1b. PERFORMANS İZLEME (YOKDIL_TRACE=1 veya yönetici panelinden) ---
+# Her çalıştırma (tam sayfa / fragment) bir iz olur; oturum toplamları session_state'te tutulur.
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("YOKDIL_ADMINS", "").split(",") if e.strip()}
+
+def perf_state():
+    state = st.session_state.get('perf')
+    if state is None:
+        state = {'session': uuid.uuid4().hex[:8], 'stats': perf.Stats(), 'history': deque(maxlen=200), 'open': None}
+        st.session_state.perf = state
+    return state
+
+def perf_begin(label):
+    if not perf.enabled:
+        return
+    state = perf_state()
+    if state['open'] is not None:
+        # st.rerun() ile kesilen önceki çalıştırma
+        perf.end(state['open'], state['stats'], state['history'])
+    state['open'] = perf.begin(label, state['session'])
+
+def perf_end():
+    state = st.session_state.get('perf')
+    if state is not None and state['open'] is not None:
+        perf.end(state['open'], state['stats'], state['history'])
+        state['open'] = None
+
+def perf_section(name):
+    # Tam sayfa çalıştırmada bir span, fragment kendi başına yenilendiğinde ayrı bir iz
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not perf.enabled:
+                return fn(*args, **kwargs)
+            if perf.current() is not None:
+                with perf.span(f"render.{name}"):
+                    return fn(*args, **kwargs)
+            state = perf_state()
+            handle = perf.begin(f"fragment.{name}", state['session'])
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                perf.end(handle, state['stats'], state['history'])
+        return wrapper
+    return deco
+
+perf_begin("script")
 
-saved_uid = controller.get('user_uid')
 # --- 2. SESSION STATE YÖNETİMİ ---
 states = {
     'user': None,
     'last_selected_file': None,
-    'master_words': None,
     'word_index': 0,
     'quiz_shuffled_options': None,
     'match_selected_word': None,
     'match_pairs': {},
     'match_shuffled_meanings': None,
-    'match_sub_page': 0 # Eşleştirme için alt sayfa
+    'match_sub_page': 0, # Eşleştirme için alt sayfa
+    'ai_jobs': {} # Bekleyen AI işleri: iş anahtarı -> (deneme, soru)
 }
+# Kullanıcıya ait oturum verileri; çıkışta silinir ki aynı tarayıcıda giriş yapan başka kullanıcıya geçmesin
+USER_SESSION_KEYS = ('exam_docs', 'answer_logs', 'answer_log_guards', 'ai_jobs', 'srs_card',
+                     'learned_set', 'learned_set_uid', 'review_queue', 'review_queue_uid',
+                     'last_selected_file', 'current_q')
+
+# --- OTURUM ANAHTARI (imzalı çerez + doğrulanmış hesap önbelleği) ---
+@st.cache_resource(show_spinner=False)
+def get_session_secret():
+    # Anahtar kontrolü (Cloud: Secrets, Lokal: YOKDIL_SESSION_SECRET veya .session_secret dosyası)
+    try:
+        if "SESSION_SECRET" in st.secrets:
+            return str(st.secrets["SESSION_SECRET"]).encode("utf-8")
+    except Exception:
+        pass
+    return session_token.load_secret()
+
+@st.cache_resource(show_spinner=False)
+def get_account_cache():
+    # Auth'tan doğrulanmış hesaplar 5 dk boyunca tüm oturumlarca paylaşılır
+    return session_token.TTLCache(ttl=300)
+
+def verified_account(uid, refresh=False):
+    cache = get_account_cache()
+    account = None if refresh else cache.get(("uid", uid))
+    if account is None:
+        account = storage.get_account(uid)
+        cache.put(("uid", uid), account)
+    return dict(account)
+
+def start_session(account):
+    # Yeni imzalı anahtar çereze yazılır (30 gün); eski düz uid çerezi kaldırılır
+    token = session_token.issue(get_session_secret(), account)
+    controller.set(session_token.COOKIE_NAME, token, max_age=session_token.COOKIE_MAX_AGE)
+    if controller.get('user_uid'):
+        controller.remove('user_uid')
+
+def end_session():
+    for name in (session_token.COOKIE_NAME, 'user_uid'):
+        if controller.get(name):
+            controller.remove(name)
+
+def restore_session():
+    # Anahtar yerelde doğrulanır; Auth'a sadece süresi dolmuş anahtarda gidilir (ve anahtar yenilenir).
+    # sessions_valid_after'dan önce verilmiş (iptal edilmiş) anahtar yenilenmez, kullanıcı yeniden giriş yapar.
+    # Eski imzasız uid çerezine güvenilmez (imza ve şifre kontrolünü atlatırdı); sahibi yeniden giriş yapar
+    claims = session_token.verify(get_session_secret(), controller.get(session_token.COOKIE_NAME))
+    if not claims:
+        end_session()  # imzası tutmayan anahtar veya eski uid çerezi
+        return None, None
+    uid = claims['uid']
+    mirror = UserDocMirror(storage, uid)
+    valid_after = mirror.get(session_token.VALID_AFTER_FIELD, 0)
+    if session_token.is_fresh(claims, valid_after):
+        return {'uid': uid, 'email': claims.get('email')}, mirror
+    if valid_after > claims.get('iat', 0):
+        mirror.close()
+        end_session()
+        return None, None
+    try:
+        # Süresi dolan anahtar Auth'tan taze doğrulanır (silinmiş / devre dışı hesap yenilenmez)
+        account = verified_account(uid, refresh=True)
+    except Exception:
+        mirror.close()
+        raise
+    start_session(account)
+    return account, mirror
 
 if st.session_state.get('user') is None:
-    saved_uid = controller.get('user_uid')
-    if saved_uid:
-        # Çerezde UID varsa Firebase'den kullanıcı bilgilerini çekip session'a yazıyoruz
-        try:
-            user_info = auth.get_user(saved_uid)
-            st.session_state.user = {'uid': user_info.uid, 'email': user_info.email}
-            
-            user_doc = db.collection("users").document(saved_uid).get().to_dict()
-            if user_doc and "last_location" in user_doc:
-                loc = user_doc["last_location"]
+    try:
+        account, user_mirror = restore_session()
+        if account is not None:
+            # Çerezdeki oturum geçerliyse kullanıcıyı ve kaldığı yeri session'a yazıyoruz
+            st.session_state.user = account
+            st.session_state.user_mirror = user_mirror
+            st.session_state.user_mirror_uid = account['uid']
+            if user_mirror.get("last_location"):
+                loc = user_mirror.last_location()
                 st.session_state.current_mode = loc.get("mode", "📚 Deneme Çöz")
                 if "index" in loc: st.session_state.word_index = loc["index"]
                 if "file" in loc: st.session_state.last_selected_file = loc["file"]
                 if "topic" in loc: st.session_state.last_grammar_topic = loc["topic"]
-        except Exception:
-            # Çerez bozuksa veya kullanıcı silindiyse çerezi temizle
-            controller.remove('user_uid')
+    except Exception:
+        # Çerez bozuksa veya kullanıcı silindiyse çerezi temizle
+        end_session()
 
 for key, val in states.items():
     if key not in st.session_state: st.session_state[key] = val
 
 st.set_page_config(page_title="YÖKDİL Hazırlık Portalı", layout="wide", initial_sidebar_state="expanded")
 
-def get_ai_explanation(passage, question, options, correct_answer):
+@st.cache_resource(show_spinner=False)
+def get_explanation_cache():
+    # Tüm kullanıcılar için ortak AI açıklama önbelleği (yan dosyalar + LRU + Firestore ai_cache)
+    watcher = get_content_watcher()
+    cache = ExplanationCache(storage, static=watcher.current().explanations)
+    # Yan dosyalar değişince önceden üretilmiş açıklamalar tek atamayla yenilenir
+    watcher.on_swap(lambda snap: setattr(cache, "static", snap.explanations))
+    return cache
+
+def get_openai_client():
     # Anahtar kontrolü (Lokal: .env, Cloud: Secrets)
     api_key = None
     try:
@@ -99,90 +257,183 @@ def get_ai_explanation(passage, question, options, correct_answer):
         api_key = os.getenv("OPENAI_API_KEY")
     
     if not api_key:
-        return "Hata: OPENAI_API_KEY bulunamadı! (.env veya Cloud Secrets kontrol edin.)"
-
-    # OpenAI Client Tanımlama
-    client = OpenAI(api_key=api_key)
-
-    # Pasaj Kontrolü ve Dinamik Prompt
-    is_passage = passage and len(passage.strip()) > 5
-    context_text = f"--- PASAJ ---\n{passage}\n" if is_passage else ""
-    
-    role_instruction = (
-        "Verilen pasajı ve soruyu analiz ederek doğru cevabın pasajdaki dayanağını göster." 
-        if is_passage else 
-        "Verilen gramer/kelime sorusunu analiz et, kuralı veya kelime anlamını açıkla."
-    )
-
-    prompt = f"""
-    Sen uzman bir YÖKDİL/YDS İngilizce eğitmenisin.
-    Giriş veya sonuç cümleleri (Tabii, Umarım vb.) kullanma. Doğrudan analize baş.
-    {role_instruction}
-    
-    {context_text}
-    --- SORU ---
-    {question}
-    
-    --- SEÇENEKLER ---
-    {options}
-    
-    --- DOĞRU CEVAP ---
-    {correct_answer}
-    
-    Analizinde şunları yap:
-    1. Doğru cevabın neden doğru olduğunu (pasaj kanıtı veya gramer kuralı) açıkla.
-    2. Yanlış şıkların neden elendiğini (çeldirici mantığı) belirt.
-    3. Önemli 'akademik' kelimelerin Türkçe karşılıklarını ve eş anlamlılarını liste şeklinde ver.
-    4. Soru tipine özel bir 'sınav ipucu' (trick) ekle.
-    
-    Lütfen anlatımını samimi ve öğretici tut.
-    """
+        return None
+
+    # OpenAI Client Tanımlama (openai modülü ilk AI analizinde yüklenir)
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+@st.cache_resource(show_spinner=False)
+def get_ai_queue():
+    # Süreç genelinde tek iş kuyruğu: sınırlı işçi, tek istemci, aynı soruya tek çağrı
+    return AIJobQueue(get_openai_client, get_explanation_cache())
+
+@st.fragment(run_every=1)
+@perf_section("ai_job_status")
+def ai_job_status(job_key, uid, deneme_id, q_no):
+    # Sadece bu parça saniyede bir yenilenir; iş bitince sonuç kaydedilip sayfa tazelenir
+    job = get_ai_queue().get(job_key)
+    if job is None:
+        st.session_state.ai_jobs.pop(job_key, None)
+        st.rerun()
+    if job.status == DONE:
+        storage.merge_exam(uid, deneme_id, {"ai_explanations": {str(q_no): job.text}})
+        get_exam_doc(uid, deneme_id).setdefault("ai_explanations", {})[str(q_no)] = job.text
+        st.session_state.ai_jobs.pop(job_key, None)
+        st.rerun()
+    elif job.status == FAILED:
+        st.error(f"OpenAI Analiz Hatası: {job.error}")
+        if st.button("🔁 Tekrar Dene", key=f"ai_retry_{job_key}"):
+            st.session_state.ai_jobs.pop(job_key, None)
+            st.rerun()
+    else:
+        label = "Sırada bekliyor..." if job.status == QUEUED else f"OpenAI analiz ediyor... (deneme {job.attempts})"
+        st.caption(f"⏳ {label}")
+        if job.text:
+            st.markdown(job.text)
 
+# --- 3. YARDIMCI FONKSİYONLAR ---
+def rerun_fragment():
+    # Parça kendi yenilemesindeyse sadece parçayı, tam sayfa çalışmasının içindeyse sayfayı yenile
     try:
-        # OpenAI o-serisi (o1-mini, o4 vb.) modelleri için çağrı
-        # Not: Eğer o1-mini veya o1-preview kullanıyorsan 'o1-mini' yazabilirsin. 
-        # Standart GPT-4o için 'gpt-4o' kullanabilirsin.
-        response = client.chat.completions.create(
-            model="gpt-4o", # Buraya o4 veya o1-mini yazabilirsin
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"OpenAI Analiz Hatası: {str(e)}"
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
 
-# --- 3. YARDIMCI FONKSİYONLAR ---
-def format_text(text):
-    if not text: return ""
-    return " ".join(text.split())
+@st.cache_resource(show_spinner=False)
+def get_content_watcher():
+    # Deneme paketi, kelime deposu (+ arama / çeldirici indeksleri) ve gramer notları süreç başına bir kez
+    # (ilk girişten sonra) yüklenir, tüm oturumlar paylaşır. Dosyalar değişince sadece ilgili parça
+    # arka planda yeniden kurulur.
+    return ContentWatcher()
+
+def content():
+    # Bu çalıştırmanın içerik sürümü: tam sayfa çalıştırmada en günceli alınır (aşağıda),
+    # fragment yenilemeleri aynı sürümle devam eder
+    snap = st.session_state.get('content')
+    return snap if snap is not None else get_content_watcher().current()
+
+def get_exam_pack():
+    return content().pack
+
+def get_word_store():
+    return content().words
+
+def get_word_search_index():
+    return content().word_search
+
+def get_distractor_index():
+    # Kelime başına önceden seçilmiş çeldiriciler (python distractors.py ile üretilir)
+    return content().distractors
+
+def get_grammar_index():
+    # Gramer notları: konu -> bölüm -> madde, hazır markdown ve arama indeksiyle
+    return content().grammar
+
+@st.cache_resource(show_spinner=False)
+def get_user_writer():
+    # users/{uid} alan yazımları (konum, öğrenilen kelimeler) tüm oturumlar için
+    # tek bir arka plan yazıcısında birleştirilir
+    return WriteBehind(storage.merge_user)
+
+@st.cache_resource(show_spinner=False)
+def get_exam_writer():
+    # Deneme cevapları (uid, deneme) başına birleştirilip aralıklı yazılır
+    return WriteBehind(lambda key, data: storage.merge_exam(key[0], key[1], data), interval=5.0)
+
+@st.cache_resource(show_spinner=False)
+def get_answer_stats():
+    # Soru zorluk sayaçları süreç genelinde toplanıp parçalı belgelere yazılır, özetler paylaşılır
+    return AnswerStats(storage)
+
+def get_user_mirror(uid):
+    # users/{uid} belgesi oturum başına bir kez okunur, sonra bellekten servis edilir
+    mirror = st.session_state.get('user_mirror')
+    if mirror is None or st.session_state.get('user_mirror_uid') != uid:
+        if mirror is not None: mirror.close()
+        mirror = UserDocMirror(storage, uid)
+        st.session_state.user_mirror = mirror
+        st.session_state.user_mirror_uid = uid
+    if st.session_state.get('location_flush_uid') != uid:
+        st.session_state.location_flush_uid = uid
+        st.session_state.location_flush_guard = flush_on_session_end(get_user_writer(), uid)
+    return mirror
 
 def save_last_location(uid, mode, **kwargs):
     progress_data = {
         "mode": mode,
-        "timestamp": firestore.SERVER_TIMESTAMP
+        "timestamp": storage.server_timestamp()
     }
     progress_data.update(kwargs) 
-    db.collection("users").document(uid).set({"last_location": progress_data}, merge=True)
+    # Yazım arka planda yapılır; tıklama Firestore'u beklemez
+    get_user_writer().put(uid, {"last_location": progress_data})
+    get_user_mirror(uid).apply({"last_location": progress_data})
+
+def save_learned_set(uid, learned, **extra):
+    data = {BITS_FIELD: learned.to_bytes()}
+    data.update(extra)
+    get_user_writer().put(uid, data)
+    get_user_mirror(uid).apply(data)
+
+def get_learned_set(uid, words):
+    # Öğrenilen kelimeler kullanıcı belgesindeki bit kümesinden gelir (ek okuma yok)
+    learned = st.session_state.get('learned_set')
+    if learned is None or st.session_state.get('learned_set_uid') != uid:
+        mirror = get_user_mirror(uid)
+        blob = mirror.get(BITS_FIELD)
+        if blob is None and not mirror.get(MIGRATED_FIELD):
+            # Eski learned_words alt koleksiyonundan tek seferlik taşıma
+            learned = migrate_subcollection(storage.legacy_learned_words(uid), words)
+            save_learned_set(uid, learned, **{MIGRATED_FIELD: True})
+        else:
+            learned = LearnedSet(len(words), blob)
+        st.session_state.learned_set = learned
+        st.session_state.learned_set_uid = uid
+    elif learned.size != len(words):
+        # Kelime listesi yenilendi: kimlikler kalıcı ("id" alanı, sıra değişikliği reddedilir), mevcut bitler korunur
+        learned = LearnedSet(len(words), learned.to_bytes())
+        st.session_state.learned_set = learned
+    return learned
+
+def get_review_queue(uid):
+    # Aralıklı tekrar kuyruğu da kullanıcı belgesinden, oturum başına bir kez çözülür
+    queue = st.session_state.get('review_queue')
+    if queue is None or st.session_state.get('review_queue_uid') != uid:
+        queue = srs.ReviewQueue(get_user_mirror(uid).get(srs.QUEUE_FIELD))
+        st.session_state.review_queue = queue
+        st.session_state.review_queue_uid = uid
+    return queue
+
+def record_review(uid, word_id, correct, new=False):
+    # Tüm etkinliklerin doğru/yanlış sonuçları aynı kuyruğu besler
+    queue = get_review_queue(uid)
+    queue.record(word_id, correct)
+    data = {srs.QUEUE_FIELD: queue.to_bytes()}
+    if new:
+        mirror = get_user_mirror(uid)
+        day = srs.today()
+        new_state = mirror.get(srs.NEW_FIELD) or {}
+        count = new_state.get("count", 0) if new_state.get("day") == day else 0
+        data[srs.NEW_FIELD] = {"day": day, "count": count + 1}
+    get_user_writer().put(uid, data)
+    get_user_mirror(uid).apply(data)
 
 # --- 4. GRAMER NOTLARI MODÜLÜ (Eksiksiz Okuma) ---
 def grammar_app():
     uid = st.session_state.user['uid']
     st.title("📖 YÖKDİL Gramer Notları")
     
-    if not os.path.exists(GRAMMAR_FILE):
+    # Notlar süreç başına bir kez okunup indekslenir
+    grammar = get_grammar_index()
+    if grammar is None:
         st.error("grammar_notes.json bulunamadı! Lütfen dosyayı ana dizine ekleyin.")
         return
 
-    # 1. Firebase'den son konumu çek
-    user_doc = db.collection("users").document(uid).get().to_dict()
-    last_loc = user_doc.get("last_location", {}) if user_doc else {}
-
-    with open(GRAMMAR_FILE, "r", encoding="utf-8") as f:
-        grammar_data = json.load(f)
+    # 1. Son konum (bellekteki kullanıcı aynasından)
+    last_loc = get_user_mirror(uid).last_location()
 
     # --- HAFIZA: Konu Seçimi ---
-    konu_listesi = list(grammar_data.keys())
+    konu_listesi = list(grammar.topics)
     
     # Hafıza: Eğer en son Gramer modundaysak, o konuyu bul
     d_konu_idx = 0
@@ -196,43 +447,56 @@ def grammar_app():
     # Eğer seçilen konu Firebase'deki kayıttan farklıysa, konumu güncelle
     if last_loc.get("topic") != secilen_konu:
         save_last_location(uid, "📖 Gramer Notları", topic=secilen_konu)
-    
+
+    grammar_panel(secilen_konu)
+
+GRAMMAR_PAGE_SIZE = 5
+
+@st.fragment
+@perf_section("grammar_panel")
+def grammar_panel(secilen_konu):
+    # Arama, sayfa değişimi ve bölüm açma/kapama sadece bu paneli yeniler
+    grammar = get_grammar_index()
+    query = st_keyup("🔎 Tüm notlarda ara", key="grammar_search_query", debounce=200,
+                     placeholder="ör. if clause, wish, would rather")
+
+    if query and query.strip():
+        results = grammar.search(query)
+        st.caption(f"{len(results)} sonuç")
+        for item in results:
+            section = grammar.sections[item.topic][item.section]
+            with st.expander(f"{item.topic} › {section.name}" + (f" › {item.title}" if item.title else "")):
+                st.markdown(item.markdown)
+        return
+
     st.header(f"✨ {secilen_konu}")
     st.divider()
 
-    # Alt konuları döngüye al
-    for section in grammar_data[secilen_konu]:
-        with st.expander(f"📘 {section.get('topic', 'Genel Kurallar')}", expanded=True):
-            for item in section.get('content', []):
-                # Başlık (Title)
-                if "title" in item:
-                    st.markdown(f"**📍 {item['title']}**")
-                
-                # Kural Metni (Mavi kutu)
-                if "rule" in item:
-                    st.info(item["rule"])
-                
-                # Formül Metni (Kod bloğu)
-                if "formula" in item:
-                    st.code(item["formula"], language="text")
-                
-                # Örnekler
-                if "examples" in item:
-                    for ex in item["examples"]:
-                        st.write(f"→ {ex}")
-                st.write("") # Görsel boşluk
+    # Bölümler kapalı gelir; içerik sadece açılan bölüm için çizilir
+    sections = grammar.sections[secilen_konu]
+    total_pages = max(1, (len(sections) + GRAMMAR_PAGE_SIZE - 1) // GRAMMAR_PAGE_SIZE)
+    page = 1
+    if total_pages > 1:
+        page = st.number_input("Sayfa", min_value=1, max_value=total_pages, value=1, key=f"grammar_page_{secilen_konu}")
+    start = (page - 1) * GRAMMAR_PAGE_SIZE
+    for section in sections[start:start + GRAMMAR_PAGE_SIZE]:
+        if st.toggle(f"📘 {section.name} ({len(section.items)})", key=f"grammar_open_{secilen_konu}_{section.index}"):
+            st.markdown(section.markdown)
         st.divider()
 
 # --- 5. ETKİNLİK MODÜLLERİ (KELİME ÇALIŞMA) ---
 
 # --- 5. ETKİNLİK MODÜLLERİ (KELİME ÇALIŞMA - FULL ENTEGRE) ---
 
+@st.fragment
+@perf_section("flash_card_ui")
 def flash_card_ui(word_data, is_learned):
+    # Telaffuz / anlam etkileşimleri sadece kartı yeniler
     border_color = "#4CAF50" if is_learned else "#4F8BF9"
     st.markdown(f"""
         <div style="background-color: #1E1E1E; padding: 50px; border-radius: 15px; border: 3px solid {border_color}; text-align: center;">
-            <h1 style="color: {border_color}; font-size: 65px; margin-bottom:0;">{word_data['word']}</h1>
-            <p style="color: #888; font-size: 20px;">{word_data['type']} {'✅ [ÖĞRENİLDİ]' if is_learned else ''}</p>
+            <h1 style="color: {border_color}; font-size: 65px; margin-bottom:0;">{word_data.word}</h1>
+            <p style="color: #888; font-size: 20px;">{word_data.type} {'✅ [ÖĞRENİLDİ]' if is_learned else ''}</p>
         </div>
     """, unsafe_allow_html=True)
     
@@ -240,106 +504,93 @@ def flash_card_ui(word_data, is_learned):
     col_v1, col_v2, col_v3 = st.columns([1, 1, 1])
     with col_v2: # Ortaya hizalayalım
         if st.button("🔊 Telaffuzu Dinle", use_container_width=True):
-            play_tts(word_data['word'])
+            play_tts(word_data.word)
 
     st.write("")
     with st.expander("Anlamı, Eş ve Zıt Anlamları Gör"):
         col1, col2 = st.columns(2)
         with col1:
             st.info("🇹🇷 **Türkçe Karşılıklar**")
-            for m in word_data['means']: st.write(f"• {m}")
+            for m in word_data.means: st.write(f"• {m}")
         with col2:
             st.info("🔗 **Kelimeler Arası İlişki**")
-            st.write(f"**Synonyms:** {', '.join(word_data['synonyms'])}")
-            if word_data.get('antonyms'):
-                st.write(f"**Antonyms:** {', '.join(word_data['antonyms'])}")
+            st.write(f"**Synonyms:** {', '.join(word_data.synonyms)}")
+            if word_data.antonyms:
+                st.write(f"**Antonyms:** {', '.join(word_data.antonyms)}")
 
 def writing_ui(word_data, total_len):
-    target_word = word_data['word'].strip()
-    st.info(f"Anlamı: **{', '.join(word_data['means'])}** ({word_data['type']})")
-    
-    if st.button("🔍 Harf Havuzunu Göster", use_container_width=True):
-        chars = list(target_word.upper())
-        random.shuffle(chars)
-        st.info(f"💡 Harf Havuzu: `{' '.join(chars)}`")
-
-    invisible_spaces = "\u200b" * (st.session_state.word_index % 10) 
-    dynamic_label = f"Kelimeyi Yazın{invisible_spaces}"
-
-    user_input = st_keyup(
-        label=dynamic_label, 
-        key=f"ku_final_{target_word}_{st.session_state.word_index}", 
-        debounce=0
-    ).strip()
-
-    display_html = '<div style="text-align:center; font-family: monospace; font-size: 30px; letter-spacing: 5px;">'
-    correct_count = 0
-    for i in range(len(target_word)):
-        if i < len(user_input):
-            u_char = user_input[i].upper()
-            t_char = target_word[i].upper()
-            if u_char == t_char:
-                display_html += f'<span style="color: #4F8BF9;">{u_char}</span>'
-                correct_count += 1
-            else:
-                display_html += f'<span style="color: #FF4B4B; text-decoration: underline;">{u_char}</span>'
-        else:
-            display_html += '<span style="color: #555;">_</span>'
-    display_html += '</div>'
-    st.markdown(display_html, unsafe_allow_html=True)
+    target_word = word_data.word.strip()
+    st.info(f"Anlamı: **{', '.join(word_data.means)}** ({word_data.type})")
+
+    # Harf harf kontrol tarayıcıda yapılır; tuş vuruşları sunucuyu hiç yenilemez.
+    # Sunucu sadece kelime tamamlanınca veya atlanınca tek bir değer alır.
+    nonce = f"{word_data.id}_{st.session_state.word_index}"
+    result = typing_trainer(target=target_word, nonce=nonce, key=f"typing_{nonce}", default=None)
 
     # --- OTOMATİK GEÇİŞ VE KAYIT ---
-    if correct_count == len(target_word) and len(user_input) == len(target_word):
-        st.success(f"🎯 Harika! Doğru: **{target_word}**")
-        time.sleep(1)
+    if result and result.get("nonce") == nonce:
+        if result.get("event") == "complete":
+            st.toast(f"🎯 Harika! Doğru: **{target_word}**")
+        record_review(st.session_state.user['uid'], word_data.id, result.get("event") == "complete")
         
-        # Otomatik geçerken Firebase'e yeni konumu kaydet
+        # Otomatik geçerken yeni konumu kaydet (arka planda yazılır, beklemeden geçilir)
         new_index = (st.session_state.word_index + 1) % total_len
         save_last_location(
             st.session_state.user['uid'], 
             "🗂️ Kelime Çalış", 
             index=new_index, 
-            type=word_data['type'], 
+            type=word_data.type, 
             activity="Yazma Alıştırması",
             page=st.session_state.get('current_page_val', 1)
         )
         
         st.session_state.word_index = new_index
-        st.rerun()
+        rerun_fragment()
 
 def multiple_choice_ui(word_data, current_set):
-    st.subheader(f"**{word_data['word']}**")
+    st.subheader(f"**{word_data.word}**")
     if st.session_state.quiz_shuffled_options is None:
-        correct_ans = ", ".join(word_data['means'])
-        others = [", ".join(w['means']) for w in current_set if w['word'] != word_data['word']]
+        correct_ans = word_data.meaning
+        # Aynı türden, anlamca/yazılışça yakın çeldiriciler indeksten; indeks yetmezse paketten tamamlanır
+        store = get_word_store()
+        others = [store.words[i].meaning for i in get_distractor_index().get(word_data.id, [])]
         distractors = random.sample(others, min(3, len(others)))
+        if len(distractors) < 3:
+            rest = [w.meaning for w in current_set if w.word != word_data.word and w.meaning not in distractors]
+            distractors += random.sample(rest, min(3 - len(distractors), len(rest)))
         options = distractors + [correct_ans]
         random.shuffle(options)
         st.session_state.quiz_shuffled_options = options
 
     user_choice = st.radio("Seçenekler:", st.session_state.quiz_shuffled_options)
     if st.button("Kontrol Et"):
-        if user_choice == ", ".join(word_data['means']):
+        if user_choice == word_data.meaning:
             st.success("Doğru! 🎯")
+            record_review(uid, word_data.id, True)
             new_index = (st.session_state.word_index + 1) % len(current_set)
             st.session_state.word_index = new_index
             st.session_state.quiz_shuffled_options = None 
             
             save_last_location(uid, "🗂️ Kelime Çalış", 
                                index=new_index, 
-                               type=word_data['type'], 
+                               type=word_data.type, 
                                page=st.session_state.get('current_page_val', 1),
                                activity="Çoktan Seçmeli")
-            st.rerun()
+            rerun_fragment()
         else:
-            st.error(f"Yanlış. Doğru cevap: {', '.join(word_data['means'])}")
+            record_review(uid, word_data.id, False)
+            st.error(f"Yanlış. Doğru cevap: {', '.join(word_data.means)}")
 
+@st.fragment
+@perf_section("matching_ui")
 def matching_ui(current_set):
+    # Eşleştirme tahtası kendi başına yenilenir (sayfanın geri kalanı yeniden çizilmez)
     st.subheader("🧩 Kelime - Anlam Eşleştirme")
     sub_size = 5
     start_i = st.session_state.match_sub_page * sub_size
     subset = current_set[start_i:start_i + sub_size]
-    target_meanings = {w['word']: ", ".join(w['means']) for w in subset}
+    target_meanings = {w.word: w.meaning for w in subset}
+    word_ids = {w.word: w.id for w in subset}
     
     sub_key = f"sub_{st.session_state.match_sub_page}"
     if st.session_state.match_shuffled_meanings is None or st.session_state.get('last_sub_key') != sub_key:
@@ -358,7 +609,7 @@ def matching_ui(current_set):
             st.session_state.match_sub_page += 1
             st.session_state.match_shuffled_meanings = None
             st.session_state.match_pairs = {}
-            st.rerun()
+            rerun_fragment()
 
     c1, c2 = st.columns(2)
     with c1:
@@ -367,7 +618,7 @@ def matching_ui(current_set):
             selected = st.session_state.match_selected_word == word
             if st.button(f"{word} ✅" if matched else word, key=f"match_w_{word}", disabled=matched, use_container_width=True, type="primary" if selected else "secondary"):
                 st.session_state.match_selected_word = word
-                st.rerun()
+                rerun_fragment()
                 
     with c2:
         for m in st.session_state.match_shuffled_meanings:
@@ -375,13 +626,15 @@ def matching_ui(current_set):
             if st.button(f"✅ {m}" if matched_w else m, key=f"match_m_{m[:20]}", disabled=matched_w is not None, use_container_width=True):
                 if st.session_state.match_selected_word:
                     if m == target_meanings[st.session_state.match_selected_word]:
+                        record_review(uid, word_ids[st.session_state.match_selected_word], True)
                         st.session_state.match_pairs[st.session_state.match_selected_word] = m
                         st.session_state.match_selected_word = None
                         st.toast("Doğru! 🟢")
-                        st.rerun() # Eşleşme anında sayfayı tazele ki yukarıdaki 5/5 kontrolü çalışsın
+                        rerun_fragment() # Eşleşme anında sayfayı tazele ki yukarıdaki 5/5 kontrolü çalışsın
                     else:
+                        record_review(uid, word_ids[st.session_state.match_selected_word], False)
                         st.error("Yanlış eşleşme! 🔴")
-                        st.rerun()
+                        rerun_fragment()
                 else:
                     st.warning("Önce bir kelime seçin!")
     
@@ -392,13 +645,13 @@ def matching_ui(current_set):
             st.session_state.match_sub_page -= 1
             st.session_state.match_shuffled_meanings = None
             st.session_state.match_pairs = {}
-            st.rerun()
+            rerun_fragment()
     with nc3:
         if st.button("Sonraki 5'li ➡️", disabled=st.session_state.match_sub_page >= 3):
             st.session_state.match_sub_page += 1
             st.session_state.match_shuffled_meanings = None
             st.session_state.match_pairs = {}
-            st.rerun()
+            rerun_fragment()
 
 # --- 6. KELİME UYGULAMASI (ANA GÖVDE) ---
 def words_app():
@@ -413,20 +666,14 @@ def words_app():
         st.error("Kullanıcı kimliği doğrulanamadı.")
         return
     
-    # Firebase'den en son nerede kaldığını çek (Sadece ilk açılışta veya uyku sonrası)
-    user_doc = db.collection("users").document(uid).get().to_dict()
-    last_loc = user_doc.get("last_location", {}) if user_doc else {}
-
-    if st.session_state.master_words is None:
-        with open(WORDS_FILE, "r", encoding="utf-8") as f:
-            raw_data = json.load(f)
-            raw_data.sort(key=lambda x: x['word'])
-            random.seed(42)
-            random.shuffle(raw_data)
-            st.session_state.master_words = raw_data
+    # En son nerede kaldığını kullanıcı aynasından al (Firebase'e gitmeden)
+    last_loc = get_user_mirror(uid).last_location()
+
+    # Kelimeler, tür listeleri ve paketler süreç genelindeki depodan (oturumda kopya yok)
+    store = get_word_store()
 
     # --- SİDEBAR AYARLARI ---
-    all_types = sorted(list(set(w['type'] for w in st.session_state.master_words)))
+    all_types = list(store.types)
     
     # Hafıza: Tür
     d_type_idx = 0
@@ -434,9 +681,7 @@ def words_app():
         d_type_idx = all_types.index(last_loc.get("type"))
     selected_type = st.sidebar.selectbox("Kelime Türü Seçin", all_types, index=d_type_idx)
     
-    type_specific_words = [w for w in st.session_state.master_words if w['type'] == selected_type]
-    page_size = 20
-    total_pages = (len(type_specific_words) // page_size) + (1 if len(type_specific_words) % page_size > 0 else 0)
+    total_pages = store.page_count(selected_type)
     
     # Hafıza: Paket (Page)
     d_page = int(last_loc.get("page", 1)) if last_loc.get("type") == selected_type else 1
@@ -450,8 +695,7 @@ def words_app():
         d_act_idx = act_list.index(last_loc.get("activity"))
     activity = st.sidebar.radio("Etkinlik Seçin", act_list, index=d_act_idx)
     
-    current_set = type_specific_words[(selected_page - 1) * page_size : selected_page * page_size]
-    current_set = [w for w in current_set if w and isinstance(w, dict) and w.get('word')]
+    current_set = store.page(selected_type, selected_page)
     
     # --- SAYFA / ETKİNLİK DEĞİŞİM KONTROLÜ ---
     key = f"{selected_type}_{selected_page}_{activity}"
@@ -473,39 +717,24 @@ def words_app():
         st.warning("Bu pakette kelime bulunamadı.")
         return
 
-    st.progress((st.session_state.word_index + 1) / len(current_set))
-    st.write(f"**{selected_type}** | Paket {selected_page} | Kelime: {st.session_state.word_index + 1}/{len(current_set)}")
-
-    word_data = current_set[st.session_state.word_index]
-    
-    # Kelime ismini temizle ve kontrol et
-    word_name = word_data.get('word', '').lower().strip()
+    word_study_panel(uid, current_set, selected_type, selected_page, activity)
 
-    # EĞER KELİME İSMİ BOŞSA (Hata burada kopuyor)
-    # 1. Kelime verisini al
-    word_data = current_set[st.session_state.word_index]
+@st.fragment
+@perf_section("word_study_panel")
+def word_study_panel(uid, current_set, selected_type, selected_page, activity):
+    # Kelime geçişleri, öğrendim/öğrenmedim ve etkinlik etkileşimleri sadece bu paneli yeniler.
+    # Tür / paket / etkinlik değişimi (kenar çubuğu) tam sayfa yenilemesiyle gelir.
+    store = get_word_store()
+    learned = get_learned_set(uid, store.words)
+    type_ids = store.type_ids[selected_type]
 
-    # 2. Kelime ismini güvenli bir şekilde çek (Yoksa boş string ata)
-   # Kelime ismini al ve temizle
-    raw_word = word_data.get('word', '')
-    
-    # --- KRİTİK DÜZELTME: / işaretini _ ile değiştir ---
-    # Bu sayede "Keep away / Keep off" -> "keep away _ keep off" olur ve hata biter.
-    doc_id = str(raw_word).lower().strip().replace("/", "_").replace(".", "")
+    st.progress((st.session_state.word_index + 1) / len(current_set))
+    st.write(f"**{selected_type}** | Paket {selected_page} | Kelime: {st.session_state.word_index + 1}/{len(current_set)} | ✅ Öğrenilen: {learned.count(type_ids)}/{len(type_ids)}")
 
-    if not doc_id:
-        st.warning("Hatalı kelime verisi atlanıyor...")
-        st.session_state.word_index = (st.session_state.word_index + 1) % len(current_set)
-        st.rerun()
-        return
+    word_data = current_set[st.session_state.word_index]
 
-    # Artık yol her zaman temiz ve çift elemanlı
-    word_ref = db.collection("users").document(uid).collection("learned_words").document(doc_id)
-    
-    try:
-        is_learned = word_ref.get().exists
-    except Exception:
-        is_learned = False # Bağlantı anlık giderse hata verme
+    # Öğrenildi bilgisi bellekteki bit kümesinden (kart başına Firestore okuması yok)
+    is_learned = learned.has(word_data.id)
 
     # --- UI GÖSTERİMİ ---
     if activity == "Flash Card":
@@ -527,26 +756,131 @@ def words_app():
                 st.session_state.word_index = (st.session_state.word_index - 1) % len(current_set)
                 save_last_location(uid, "🗂️ Kelime Çalış", index=st.session_state.word_index, type=selected_type, page=selected_page, activity=activity)
                 st.session_state.quiz_shuffled_options = None
-                st.rerun()
+                rerun_fragment()
         with b2:
             if st.button("✅ ÖĞRENDİM", use_container_width=True):
-                word_ref.set({"learned": True, "type": selected_type})
+                learned.add(word_data.id)
+                save_learned_set(uid, learned)
+                record_review(uid, word_data.id, True)
                 st.session_state.word_index = (st.session_state.word_index + 1) % len(current_set)
                 save_last_location(uid, "🗂️ Kelime Çalış", index=st.session_state.word_index, type=selected_type, page=selected_page, activity=activity)
                 st.session_state.quiz_shuffled_options = None
-                st.rerun()
+                rerun_fragment()
         with b3:
             if st.button("❌ ÖĞRENMEDİM", use_container_width=True):
-                word_ref.delete()
+                learned.discard(word_data.id)
+                save_learned_set(uid, learned)
+                record_review(uid, word_data.id, False)
                 st.session_state.word_index = (st.session_state.word_index + 1) % len(current_set)
                 save_last_location(uid, "🗂️ Kelime Çalış", index=st.session_state.word_index, type=selected_type, page=selected_page, activity=activity)
                 st.session_state.quiz_shuffled_options = None
-                st.rerun()
+                rerun_fragment()
         with b4:
             if st.button("Sonraki ➡️"):
                 st.session_state.word_index = (st.session_state.word_index + 1) % len(current_set)
                 save_last_location(uid, "🗂️ Kelime Çalış", index=st.session_state.word_index, type=selected_type, page=selected_page, activity=activity)
                 st.session_state.quiz_shuffled_options = None
+                rerun_fragment()
+
+# --- 6b. ARALIKLI TEKRAR ---
+def review_app():
+    st.title("🔁 Aralıklı Tekrar")
+    st.caption("Vakti gelen kelimeler önce, sonra günde en fazla "
+               f"{srs.NEW_PER_DAY} yeni kelime. Bildikçe kelime daha seyrek sorulur.")
+    review_panel(st.session_state.user['uid'])
+
+@st.fragment
+@perf_section("review_panel")
+def review_panel(uid):
+    store = get_word_store()
+    queue = get_review_queue(uid)
+    mirror = get_user_mirror(uid)
+
+    card = st.session_state.get('srs_card')
+    if card is None:
+        word_id, is_new = queue.next_due(), False
+        if word_id is None:
+            word_id = srs.next_new_word(queue, store.order, mirror.get(srs.NEW_FIELD) or {})
+            is_new = word_id is not None
+        if word_id is None:
+            st.success("🎉 Bugünlük tekrar bitti!")
+            next_time = queue.next_time()
+            if next_time:
+                st.caption(f"Sıradaki tekrar: {time.strftime('%d.%m %H:%M', time.localtime(next_time))}")
+            return
+        card = (word_id, is_new)
+        st.session_state.srs_card = card
+        st.session_state.srs_reveal = False
+
+    word_id, is_new = card
+    w = store.words[word_id]
+    st.write(f"⏰ Vakti gelen: {queue.due_count()} | 📦 Kutu: {queue.box(word_id)}/{srs.MAX_BOX} | "
+             f"📚 Kuyrukta: {len(queue)}/{len(store)} {'| 🆕 Yeni kelime' if is_new else ''}")
+    st.markdown(f"""
+        <div style="background-color: #1E1E1E; padding: 40px; border-radius: 15px; border: 3px solid #4F8BF9; text-align: center;">
+            <h1 style="color: #4F8BF9; font-size: 55px; margin-bottom:0;">{w.word}</h1>
+            <p style="color: #888; font-size: 20px;">{w.type}</p>
+        </div>
+    """, unsafe_allow_html=True)
+    st.write("")
+
+    if not st.session_state.get('srs_reveal'):
+        c1, c2 = st.columns(2)
+        with c1:
+            if st.button("🔊 Telaffuzu Dinle", use_container_width=True):
+                play_tts(w.word)
+        with c2:
+            if st.button("👀 Cevabı Göster", type="primary", use_container_width=True):
+                st.session_state.srs_reveal = True
+                rerun_fragment()
+        return
+
+    st.info(f"🇹🇷 **{w.meaning}**")
+    if w.synonyms: st.write(f"**Synonyms:** {', '.join(w.synonyms)}")
+    c1, c2 = st.columns(2)
+    for col, label, correct in ((c1, "❌ Bilmedim", False), (c2, "✅ Bildim", True)):
+        with col:
+            if st.button(label, key=f"srs_{word_id}_{correct}", use_container_width=True):
+                record_review(uid, word_id, correct, new=is_new)
+                st.session_state.srs_card = None
+                rerun_fragment()
+
+# --- 6c. KELİME ARAMA ---
+def search_app():
+    st.title("🔎 Kelime Ara")
+    st.caption("Kelime, Türkçe anlam, eş veya zıt anlam yazın; yazım hataları da tolere edilir.")
+    word_search_panel(st.session_state.user['uid'])
+
+@st.fragment
+@perf_section("word_search_panel")
+def word_search_panel(uid):
+    # Her tuş vuruşu sadece bu paneli yeniler; sorgu paylaşılan indekste çalışır
+    store = get_word_store()
+    query = st_keyup("Arama", key="word_search_query", debounce=150, placeholder="ör. abandon, vazgeçmek, acomodate")
+    if not query or not query.strip():
+        return
+
+    results = get_word_search_index().search(query, limit=20)
+    if not results:
+        st.info("Sonuç bulunamadı.")
+        return
+
+    learned = get_learned_set(uid, store.words)
+    for word_id, score, field in results:
+        w = store.words[word_id]
+        w_type, page_no, idx = store.positions[word_id]
+        c1, c2 = st.columns([4, 1])
+        with c1:
+            st.markdown(f"**{w.word}** ({w.type}) {'✅' if learned.has(word_id) else ''} — {w.meaning}")
+            extra = []
+            if w.synonyms: extra.append(f"Syn: {', '.join(w.synonyms)}")
+            if w.antonyms: extra.append(f"Ant: {', '.join(w.antonyms)}")
+            st.caption(f"Paket {page_no} · " + " · ".join(extra))
+        with c2:
+            if st.button("🗂️ Çalış", key=f"search_go_{word_id}", use_container_width=True):
+                # Kelime Çalış ekranı bu konumdan açılır (tür, paket ve sıra kalıcı konumdan okunur)
+                save_last_location(uid, "🗂️ Kelime Çalış", index=idx, type=w_type, page=page_no, activity="Flash Card")
+                st.session_state.prev_key = None
                 st.rerun()
 
 # --- 7. GİRİŞ / KAYIT EKRANI ---
@@ -560,51 +894,67 @@ def auth_ui():
             lp = st.text_input("Şifre", type="password")
             if st.form_submit_button("Giriş Yap"):
                 try:
-                    # Not: Normalde auth.verify_password kullanılır ama 
-                    # senin mevcut yapın e-posta üzerinden uid çekiyor.
-                    user = auth.get_user_by_email(le)
+                    user = storage.verify_password(le, lp)
+                    get_account_cache().put(("uid", user['uid']), user)
                     
                     # Session State'e kaydet
-                    st.session_state.user = {'uid': user.uid, 'email': le}
+                    st.session_state.user = {'uid': user['uid'], 'email': le}
                     
-                    # --- KRİTİK: Çerezi Tarayıcıya Yaz (30 Günlük) ---
-                    controller.set('user_uid', user.uid, max_age=2592000)
+                    # --- KRİTİK: İmzalı Oturum Anahtarını Çereze Yaz (30 Günlük) ---
+                    start_session(user)
                     time.sleep(0.5)
                     msg_placeholder.success("Giriş başarılı!")
                     st.rerun()
-                except Exception:
+                except (AccountNotFound, WrongPassword):
                     msg_placeholder.error("E-posta veya şifre hatalı.")
+                except Exception as e:
+                    # Kurulum / bağlantı sorunu kullanıcıya şifre hatası gibi gösterilmez
+                    msg_placeholder.error(f"Giriş şu anda yapılamıyor (sunucu yapılandırması): {e}")
 
     with tab2:
         with st.form("reg_form"):
             re = st.text_input("E-posta"); rp = st.text_input("Şifre", type="password")
             if st.form_submit_button("Hesap Oluştur"):
                 try: 
-                    auth.create_user(email=re, password=rp)
+                    storage.create_account(re, rp)
                     st.success("Hesap Oluşturuldu! Giriş yapabilirsiniz.")
                 except Exception as e: st.error(f"Hata: {e}")
 
 
 # --- 8. SINAV MODÜLÜ (TAM KORUNAN) ---
-def format_dialogue(text):
-    # Karakter isimlerini (İsim:) bul ve öncesine iki satır boşluğu ekleyip ismi kalın yap
-    # Büyük harfle başlayan ve iki nokta ile biten kelimeleri yakalar (Alex:, Ben:, Matt: vb.)
-    formatted_text = re.sub(r'([A-Z][a-z]+:)', r'<br><br><b>\1</b>', text)
-    
-    # Başta oluşabilecek fazla boşluğu temizle
-    if formatted_text.startswith('<br><br>'):
-        formatted_text = formatted_text[8:]
-    
-    return formatted_text
 # --- EXAM APP (AI DESTEKLİ VE KALICI SÜRÜM) ---
+def get_exam_doc(uid, deneme_id):
+    # Deneme belgesi (cevaplar + AI analizleri) oturumda bir kez okunur, parçalar bunu paylaşır
+    docs = st.session_state.setdefault('exam_docs', {})
+    if (uid, deneme_id) not in docs:
+        docs[uid, deneme_id] = storage.get_exam(uid, deneme_id)
+    return docs[uid, deneme_id]
+
+def get_answer_log(uid, deneme_id):
+    # Cevapların yerel görünümü; belge sadece ilk açılışta okunur
+    logs = st.session_state.setdefault('answer_logs', {})
+    log = logs.get(deneme_id)
+    if log is None or log.key[0] != uid:
+        doc = get_exam_doc(uid, deneme_id)
+        log = ExamAnswerLog(uid, deneme_id, get_exam_writer(), doc.get("answers", {}),
+                            stats=get_answer_stats(), counted=doc.get("stats_counted"))
+        logs[deneme_id] = log
+        st.session_state.setdefault('answer_log_guards', {})[deneme_id] = flush_on_session_end(get_exam_writer(), log.key)
+    return log
+
+def flush_answer_logs():
+    # Denemeden/moddan çıkarken ve çıkış yaparken bekleyen cevapları gönder
+    for log in st.session_state.get('answer_logs', {}).values():
+        log.flush()
+
 def exam_app():
     uid = st.session_state.user['uid']
     
-    # 1. Firebase ve Hafıza Yükleme
-    user_doc = db.collection("users").document(uid).get().to_dict()
-    last_loc = user_doc.get("last_location", {}) if user_doc else {}
-    files = sorted([f for f in os.listdir(JSON_FOLDER) if f.endswith(".json")])
-    clean = {f: f.replace(".json", "") for f in files}
+    # 1. Hafıza Yükleme (kullanıcı aynası + derlenmiş paket)
+    last_loc = get_user_mirror(uid).last_location()
+    pack = get_exam_pack()
+    files = pack.files
+    clean = {f: pack.exams[f]["id"] for f in files}
     
     d_idx = 0
     if last_loc.get("mode") == "📚 Deneme Çöz" and last_loc.get("file") in files:
@@ -613,149 +963,231 @@ def exam_app():
     sel = st.sidebar.selectbox("Deneme Seç", files, format_func=lambda x: clean[x], index=d_idx)
     
     if sel != st.session_state.get('last_selected_file'):
+        flush_answer_logs()
         st.session_state.last_selected_file = sel
         st.session_state.current_q = "1"
+        st.session_state.get('exam_docs', {}).pop((uid, clean[sel]), None)
+        st.session_state.get('answer_logs', {}).pop(clean[sel], None)
         save_last_location(uid, "📚 Deneme Çöz", file=sel, last_q="1")
         st.rerun()
 
     if sel:
         deneme_id = clean[sel]
-        user_ref = db.collection("users").document(uid).collection("denemeler").document(deneme_id)
-        user_data = user_ref.get().to_dict() or {}
-        saved_answers = user_data.get("answers", {})
-        saved_ai_explanations = user_data.get("ai_explanations", {})
-
-        with open(os.path.join(JSON_FOLDER, sel), "r", encoding="utf-8") as f: 
-            qs = json.load(f)
-        
-        q_keys = list(qs.keys())
         if 'current_q' not in st.session_state:
             st.session_state.current_q = str(last_loc.get("last_q", "1"))
 
         st.title(f"✍️ {deneme_id}")
 
-        with st.expander("📊 Tüm Soru Listesi", expanded=False):
-            cols = st.columns(10)
-            for i, q_num in enumerate(q_keys):
-                with cols[i % 10]:
-                    user_ans = saved_answers.get(str(q_num))
-                    correct_ans = qs[str(q_num)]['answer']
-                    is_active = str(q_num) == str(st.session_state.current_q)
-                    btn_label = f"{q_num}{'✅' if user_ans == correct_ans else '❌' if user_ans else ''}"
-                    if st.button(btn_label, key=f"nav_btn_{q_num}", use_container_width=True, 
-                                 type="primary" if is_active else "secondary"):
-                        st.session_state.current_q = str(q_num)
-                        save_last_location(uid, "📚 Deneme Çöz", file=sel, last_q=str(q_num))
-                        st.rerun()
+        if st.sidebar.button("🏁 Denemeyi Bitir", use_container_width=True):
+            log = get_answer_log(uid, deneme_id)
+            log.flush()
+            correct, answered = log.score(pack.exam(sel)["questions"])
+            st.sidebar.success(f"{correct} doğru / {answered} cevaplanan / {len(pack.exam(sel)['keys'])} soru")
 
-        st.divider()
+        exam_view(uid, sel, deneme_id)
 
-        # --- SORU GÖSTERİMİ ---
-        q_no = st.session_state.current_q
-        q_info = qs[q_no]
-        st.subheader(f"Soru {q_no}")
-        
-        psg = q_info.get("passage", "")
-        q_txt = q_info.get("question", "")
-        
-        # Pasaj ve Soru Ayrıştırma
-        if "--- PASSAGE ---" in q_txt:
-            parts = q_txt.split("--- QUESTION ---")
-            psg = parts[0].replace("--- PASSAGE ---", "").strip()
-            q_txt = parts[1].strip() if len(parts) > 1 else ""
-
-        # Cloze Test İçin Dinamik Vurgu (Kırmızı Boşluk)
-        if psg:
-            psg_formatted = format_text(psg)
-            # Mevcut soru numarasını içeren boşluğu bul (Örn: (17) ----)
-            pattern = rf"\({q_no}\)\s*-+"
-            
-            # Metin içinde bu kalıbı bul ve HTML ile sarmala
-            psg_formatted = re.sub(
-                pattern, 
-                f"<b style='color:#FF4B4B; text-decoration:underline; font-size:20px;'>({q_no}) ----</b>", 
-                psg_formatted
-            )
-            
-            st.markdown(f'''
-                <div style="background-color:#1E1E1E; padding:20px; border-radius:10px; border-left:5px solid #4F8BF9; font-size:18px; line-height:1.6;">
-                    {psg_formatted}
-                </div>
-            ''', unsafe_allow_html=True)
-        
-        # Soru Metni (Diyalog Düzeltmeli)
-        q_txt_final = format_text(format_dialogue(q_txt))
-        st.markdown(f'<div style="font-size:19px; line-height:1.7; margin-top:15px;">{q_txt_final}</div>', unsafe_allow_html=True)
-
-        # Şıklar ve Cevaplama
-        opts = q_info.get("options", [])
-        prev = saved_answers.get(str(q_no))
-        idx = next((i for i, o in enumerate(opts) if o.strip().startswith(str(prev))), None) if prev else None
-        
-        choice = st.radio("Cevabınız:", opts, key=f"r_{deneme_id}_{q_no}", index=idx)
-        
-        if choice:
-            letter = choice[0]
-            if prev != letter:
-                saved_answers[str(q_no)] = letter
-                user_ref.set({"answers": saved_answers}, merge=True)
-                save_last_location(uid, "📚 Deneme Çöz", file=sel, last_q=str(q_no))
-                st.rerun()
-            
-            if letter == q_info["answer"]: st.success("✅ Doğru")
-            else: st.error(f"❌ Yanlış! Cevap: {q_info['answer']}")
+@st.fragment
+@perf_section("exam_view")
+def exam_view(uid, sel, deneme_id):
+    # Soru listesi ve soru paneli tek parça: cevap, gezinme ve AI işlemleri sadece bunu yeniler
+    # (kenar çubuğu ve sayfanın geri kalanı yeniden çizilmez; ✅/❌ işaretleri cevapla birlikte güncellenir)
+    with st.expander("📊 Tüm Soru Listesi", expanded=False):
+        exam_nav_grid(uid, sel, deneme_id)
+        if st.toggle("📈 Soru zorlukları (tüm kullanıcılar)", key=f"stats_{deneme_id}"):
+            exam_difficulty_table(sel, deneme_id)
 
-        # Alt Navigasyon
-        st.write("")
-        col_prev, col_next = st.columns(2)
-        curr_idx = q_keys.index(q_no)
-        with col_prev:
-            if st.button("⬅️ Önceki", disabled=curr_idx == 0, use_container_width=True):
-                st.session_state.current_q = q_keys[curr_idx - 1]
-                save_last_location(uid, "📚 Deneme Çöz", file=sel, last_q=st.session_state.current_q)
-                st.rerun()
-        with col_next:
-            if st.button("Sonraki ➡️", disabled=curr_idx == len(q_keys)-1, use_container_width=True):
-                st.session_state.current_q = q_keys[curr_idx + 1]
-                save_last_location(uid, "📚 Deneme Çöz", file=sel, last_q=st.session_state.current_q)
-                st.rerun()
+    st.divider()
+    exam_question_panel(uid, sel, deneme_id)
+
+def go_to_question(uid, sel, q_no):
+    # Soru değişimi: liste ve soru paneli aynı parçada, sadece o yenilenir
+    # (veriler bellekte olduğundan bu yenileme Firestore'a gitmez)
+    st.session_state.current_q = str(q_no)
+    save_last_location(uid, "📚 Deneme Çöz", file=sel, last_q=str(q_no))
+    rerun_fragment()
+
+@perf_section("exam_nav_grid")
+def exam_nav_grid(uid, sel, deneme_id):
+    exam = get_exam_pack().exam(sel)
+    qs = exam["questions"]
+    saved_answers = get_answer_log(uid, deneme_id).answers
+    cols = st.columns(10)
+    for i, q_num in enumerate(exam["keys"]):
+        with cols[i % 10]:
+            user_ans = saved_answers.get(str(q_num))
+            correct_ans = qs[str(q_num)]['answer']
+            is_active = str(q_num) == str(st.session_state.current_q)
+            btn_label = f"{q_num}{'✅' if user_ans == correct_ans else '❌' if user_ans else ''}"
+            if st.button(btn_label, key=f"nav_btn_{q_num}", use_container_width=True, 
+                         type="primary" if is_active else "secondary"):
+                go_to_question(uid, sel, q_num)
+
+def exam_difficulty_table(sel, deneme_id):
+    exam = get_exam_pack().exam(sel)
+    summary = get_answer_stats().summary(deneme_id, exam["questions"])["questions"]
+    rows = []
+    for q_no in exam["keys"]:
+        q_stats = summary.get(str(q_no))
+        if not q_stats:
+            continue
+        rows.append({
+            "Soru": q_no,
+            "Çözen": q_stats["answered"],
+            "Doğru %": round(100 * q_stats["correct"] / q_stats["answered"]),
+            "En çok seçilen yanlış": q_stats["top_wrong"] or "-",
+        })
+    if rows:
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+    else:
+        st.caption("Bu deneme için henüz istatistik yok.")
+
+@perf_section("exam_question_panel")
+def exam_question_panel(uid, sel, deneme_id):
+    exam = get_exam_pack().exam(sel)
+    qs = exam["questions"]
+    q_keys = exam["keys"]
+    exam_doc = get_exam_doc(uid, deneme_id)
+    answer_log = get_answer_log(uid, deneme_id)
+    saved_answers = answer_log.answers
+    saved_ai_explanations = exam_doc.setdefault("ai_explanations", {})
+
+    # --- SORU GÖSTERİMİ ---
+    q_no = st.session_state.current_q
+    q_info = qs[q_no]
+    st.subheader(f"Soru {q_no}")
+    
+    # Pasaj/soru ayrıştırması ve HTML paket derlenirken hazırlandı
+    psg = q_info["passage"]
+    q_txt = q_info["question"]
+
+    # Cloze Test İçin Dinamik Vurgu (Kırmızı Boşluk)
+    if q_info["passage_html"]:
+        st.markdown(f'''
+            <div style="background-color:#1E1E1E; padding:20px; border-radius:10px; border-left:5px solid #4F8BF9; font-size:18px; line-height:1.6;">
+                {q_info["passage_html"]}
+            </div>
+        ''', unsafe_allow_html=True)
+    
+    # Soru Metni (Diyalog Düzeltmeli)
+    st.markdown(f'<div style="font-size:19px; line-height:1.7; margin-top:15px;">{q_info["question_html"]}</div>', unsafe_allow_html=True)
 
-        # --- 🤖 AI ANALİZİ ---
-        current_explanation = saved_ai_explanations.get(str(q_no))
-        col_spacer, col_ai = st.columns([3, 1])
-        with col_ai:
-            if current_explanation:
-                if st.button("🗑️ Analizi Sil", key=f"del_ai_{deneme_id}_{q_no}"):
-                    user_ref.update({f"ai_explanations.{q_no}": firestore.DELETE_FIELD})
-                    if str(q_no) in saved_ai_explanations: del saved_ai_explanations[str(q_no)]
-                    st.toast("Analiz silindi! 🗑️")
-                    st.rerun()
-            else:
-                if st.button(f"🤖 AI'ya Sor", key=f"ai_btn_{deneme_id}_{q_no}"):
-                    with st.spinner("OpenAI analiz ediyor..."):
-                        explanation = get_ai_explanation(psg, q_txt, opts, q_info["answer"])
-                        user_ref.set({"ai_explanations": {str(q_no): explanation}}, merge=True)
-                        st.rerun()
+    # Şıklar ve Cevaplama
+    opts = q_info["options"]
+    prev = saved_answers.get(str(q_no))
+    idx = q_info["letters"].index(prev) if prev in q_info["letters"] else None
+    
+    choice = st.radio("Cevabınız:", opts, key=f"r_{deneme_id}_{q_no}", index=idx)
+    
+    if choice:
+        letter = choice[0]
+        # Sadece bu soru alanı, arka planda (cevap ekrana hemen yansır)
+        if answer_log.record(q_no, letter):
+            save_last_location(uid, "📚 Deneme Çöz", file=sel, last_q=str(q_no))
+            # Soru listesinin ✅/❌ işaretleri de güncellensin diye parça yeniden çizilir
+            # (cevaplar bellekte olduğundan bu yenileme depolamaya gitmez)
+            rerun_fragment()
+        
+        if letter == q_info["answer"]: st.success("✅ Doğru")
+        else: st.error(f"❌ Yanlış! Cevap: {q_info['answer']}")
 
+        # Cevap verildikten sonra: bu soruyu çözenlerin başarı oranı (önceden hesaplanmış özetten)
+        q_stats = get_answer_stats().summary(deneme_id, qs)["questions"].get(str(q_no))
+        if q_stats:
+            pct = 100 * q_stats["correct"] / q_stats["answered"]
+            wrong = f" · En çok seçilen yanlış: **{q_stats['top_wrong']}**" if q_stats["top_wrong"] else ""
+            st.caption(f"📈 Çözenlerin %{pct:.0f}'i doğru yaptı ({q_stats['answered']} kişi){wrong}")
+
+    # Alt Navigasyon
+    st.write("")
+    col_prev, col_next = st.columns(2)
+    curr_idx = q_keys.index(q_no)
+    with col_prev:
+        if st.button("⬅️ Önceki", disabled=curr_idx == 0, use_container_width=True):
+            go_to_question(uid, sel, q_keys[curr_idx - 1])
+    with col_next:
+        if st.button("Sonraki ➡️", disabled=curr_idx == len(q_keys)-1, use_container_width=True):
+            go_to_question(uid, sel, q_keys[curr_idx + 1])
+
+    # --- 🤖 AI ANALİZİ ---
+    current_explanation = saved_ai_explanations.get(str(q_no))
+    pending_job = next((k for k, v in st.session_state.ai_jobs.items() if v == (deneme_id, str(q_no))), None)
+    col_spacer, col_ai = st.columns([3, 1])
+    with col_ai:
         if current_explanation:
-            st.markdown(f"""
-                <div style="background-color:#0E1117; padding:20px; border-radius:10px; border:2px solid #4F8BF9; margin-top:15px; border-left: 10px solid #4F8BF9;">
-                    <h4 style="color:#4F8BF9; margin-top:0;">🤖 AI ANALİZİ:</h4>
-                    <div style="color:#E0E0E0; line-height:1.6;">{current_explanation}</div>
-                </div>
-            """, unsafe_allow_html=True)
+            if st.button("🗑️ Analizi Sil", key=f"del_ai_{deneme_id}_{q_no}"):
+                storage.delete_exam_field(uid, deneme_id, f"ai_explanations.{q_no}")
+                if str(q_no) in saved_ai_explanations: del saved_ai_explanations[str(q_no)]
+                st.toast("Analiz silindi! 🗑️")
+                rerun_fragment()
+        else:
+            if st.button(f"🤖 AI'ya Sor", key=f"ai_btn_{deneme_id}_{q_no}", disabled=pending_job is not None):
+                # İş kuyruğa atılır, sayfa donmaz; aynı soruyu soran herkes aynı işi paylaşır
+                with perf.span("ai.submit"):
+                    job = get_ai_queue().submit(psg, q_txt, opts, q_info["answer"])
+                st.session_state.ai_jobs[job.key] = (deneme_id, str(q_no))
+                pending_job = job.key
+
+    if pending_job and not current_explanation:
+        st.markdown('<h4 style="color:#4F8BF9;">🤖 AI ANALİZİ:</h4>', unsafe_allow_html=True)
+        ai_job_status(pending_job, uid, deneme_id, q_no)
+
+    if current_explanation:
+        st.markdown(f"""
+            <div style="background-color:#0E1117; padding:20px; border-radius:10px; border:2px solid #4F8BF9; margin-top:15px; border-left: 10px solid #4F8BF9;">
+                <h4 style="color:#4F8BF9; margin-top:0;">🤖 AI ANALİZİ:</h4>
+                <div style="color:#E0E0E0; line-height:1.6;">{current_explanation}</div>
+            </div>
+        """, unsafe_allow_html=True)
+
+# --- 8b. PERFORMANS PANELİ (YÖNETİCİ) ---
+def perf_panel():
+    with st.sidebar.expander("⏱️ Performans"):
+        flag = st.checkbox("İzleme açık (tüm oturumlar)", value=perf.enabled, key="perf_enabled")
+        if flag != perf.enabled:
+            perf.set_enabled(flag)
+            st.rerun()
+        # Sıcak yenileme: yayınlanan içerik sürümü ve reddedilen (geçersiz) dosyalar
+        watcher = get_content_watcher()
+        st.caption(f"İçerik sürümü: {watcher.current().version}")
+        for path, err in watcher.current_errors().items():
+            st.warning(f"{os.path.basename(path)}: {err}")
+        if not perf.enabled:
+            st.caption("İzleme kapalı.")
+            return
+
+        state = perf_state()
+        history = list(state['history'])
+        if history:
+            last = history[-1]
+            st.caption(f"Son çalıştırma: {last.label} · {last.total_ms:.1f} ms")
+            st.dataframe([{"span": n, "ms": ms} for n, ms in last.spans], hide_index=True, use_container_width=True)
+
+        def table(stats):
+            return [{"ad": n, "adet": c, "toplam ms": round(t, 1), "ort ms": round(a, 2), "max ms": round(m, 1)}
+                    for n, c, t, a, m in stats.rows()]
+
+        st.caption("Bu oturum")
+        st.dataframe(table(state['stats']), hide_index=True, use_container_width=True)
+        st.caption("Süreç geneli (arka plan işleri dahil)")
+        st.dataframe(table(perf.process_stats), hide_index=True, use_container_width=True)
+        st.download_button("📥 İzleri indir (JSONL)", perf.to_jsonl(history),
+                           file_name=f"perf_{state['session']}.jsonl", mime="application/json")
 
 # --- 9. ANA ÇALIŞTIRICI ---
 if st.session_state.user is None:
+    # Giriş ekranı içerik gerektirmez; paket / kelime deposu ilk girişte kurulur
+    st.session_state.pop('content', None)
     auth_ui()
 else:
-    # 1. Firebase'den en son hangi ana menüde kaldığını çek
+    # Tam sayfa çalıştırmada içeriğin en güncel sürümü sabitlenir (fragment'lar bu blok çalışmadan yenilenir)
+    with perf.span("file.content"):
+        st.session_state.content = get_content_watcher().current()
+    # 1. En son hangi ana menüde kaldığını kullanıcı aynasından çek
     uid = st.session_state.user['uid']
-    user_doc = db.collection("users").document(uid).get().to_dict()
-    last_loc = user_doc.get("last_location", {}) if user_doc else {}
+    last_loc = get_user_mirror(uid).last_location()
     
     # 2. Modların listesi (Kelimelerle birebir aynı olmalı)
-    modes = ["📚 Deneme Çöz", "🗂️ Kelime Çalış", "📖 Gramer Notları"]
+    modes = ["📚 Deneme Çöz", "🗂️ Kelime Çalış", "🔁 Aralıklı Tekrar", "🔎 Kelime Ara", "📖 Gramer Notları"]
     
     # 3. Eğer Firebase'de bir kayıt varsa, onun index'ini bul (Yoksa 0 yani Deneme başlar)
     default_mode_idx = 0
@@ -768,20 +1200,39 @@ else:
 
     # Çıkış Butonu
     if st.sidebar.button("🚪 Çıkış Yap"): 
-        controller.remove('user_uid')
+        end_session()
+        flush_answer_logs()
+        get_user_writer().flush(uid)
+        if st.session_state.get('user_mirror') is not None:
+            st.session_state.user_mirror.close()
+            st.session_state.user_mirror = None
+        for key in USER_SESSION_KEYS:
+            st.session_state.pop(key, None)
         st.session_state.user = None
         st.rerun()
     
     # --- MODLARI ÇALIŞTIR ---
     # Mod değiştiğinde Firebase'e "mod değişti" kaydı atalım (isteğe bağlı ama iyidir)
     if st.session_state.get("current_active_mode") != mode:
+        if st.session_state.get("current_active_mode") == "📚 Deneme Çöz":
+            flush_answer_logs()
         st.session_state.current_active_mode = mode
         # Sadece mod bilgisini kaydet, detaylar modun kendi içinde güncellenecek
         save_last_location(uid, mode)
 
-    if mode == "📚 Deneme Çöz":
-        exam_app()
-    elif mode == "🗂️ Kelime Çalış":
-        words_app()
-    elif mode == "📖 Gramer Notları":
-        grammar_app()
\ No newline at end of file
+    with perf.span(f"render.{mode}"):
+        if mode == "📚 Deneme Çöz":
+            exam_app()
+        elif mode == "🗂️ Kelime Çalış":
+            words_app()
+        elif mode == "🔁 Aralıklı Tekrar":
+            review_app()
+        elif mode == "🔎 Kelime Ara":
+            search_app()
+        elif mode == "📖 Gramer Notları":
+            grammar_app()
+
+    if (st.session_state.user.get('email') or '').lower() in ADMIN_EMAILS:
+        perf_panel()
+
+perf_end()
@@ -0,0 +1,241 @@
+# --- ETKİLEŞİM BAŞINA DEPOLAMA MALİYETİ ÖLÇÜMÜ ---
+# Uygulamayı Streamlit AppTest ile başsız çalıştırır. Firestore yerine bellek içi depolama,
+# OpenAI / gTTS / çerez bileşeni yerine sahteleri kullanılır.
+# Deneme, kelime (4 etkinlik) ve gramer ekranlarında senaryolar yürütülür; her etkileşim için
+# yenileme süresi ve depolama okuma/yazma sayıları ölçülür (perf izleme katmanı üzerinden).
+# Sonuçlar benchmarks/budgets.json içindeki bütçelerle karşılaştırılır; aşan adım varsa çıkış kodu 1.
+# Okuma/yazma sayıları birebir, süreler --time-factor payıyla karşılaştırılır.
+# Soru istatistikleri (SHARED) süreç genelinde birleştirilip arka planda okunur/yazılır; hangi adıma
+# denk geleceği belli olmadığından bütçeye girmez, "ortak" sütununda ayrıca gösterilir.
+#
+# Kullanım:  python benchmarks/interaction_budget.py [--update] [--time-factor 3] [--json sonuc.json]
+import os
+import sys
+import json
+import time
+import types
+import argparse
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(current_dir)
+APP_FILE = os.path.join(ROOT, "app.py")
+BUDGET_FILE = os.path.join(current_dir, "budgets.json")
+sys.path.insert(0, ROOT)
+
+READS = {"get_user", "get_exam", "get_account", "find_account", "verify_password", "legacy_learned_words",
+         "get_shared_explanation"}
+WRITES = {"merge_user", "merge_exam", "delete_exam_field", "put_shared_explanation", "create_account"}
+SHARED = {"increment_answer_stats", "get_answer_stats", "get_answer_stat_shards", "put_answer_stats"}
+MIN_SLACK_MS = 50.0
+
+
+# --- SAHTELER ---
+def install_fakes(ai_delay=0.0):
+    os.environ["YOKDIL_STORAGE"] = "memory"
+    os.environ["YOKDIL_TRACE"] = "1"
+    os.environ.pop("YOKDIL_TRACE_FILE", None)
+    os.environ["OPENAI_API_KEY"] = "benchmark"
+    os.environ["YOKDIL_TTS_CACHE"] = tempfile.mkdtemp(prefix="yokdil_tts_")
+
+    cookies = types.ModuleType("streamlit_cookies_controller")
+    class CookieController:
+        # Tarayıcı başına ayrı çerez kavanozu; AppTest oturumlarının hepsi aynı session_id'yi
+        # kullandığından oturum durumu nesnesine göre ayrılır
+        jars = {}
+        @property
+        def jar(self):
+            from streamlit.runtime.scriptrunner import get_script_run_ctx
+            ctx = get_script_run_ctx()
+            return self.jars.setdefault(id(ctx.session_state) if ctx else None, {})
+        def get(self, key): return self.jar.get(key)
+        def set(self, key, value, **kwargs): self.jar[key] = value
+        def remove(self, key): self.jar.pop(key, None)
+    cookies.CookieController = CookieController
+    sys.modules["streamlit_cookies_controller"] = cookies
+
+    openai = types.ModuleType("openai")
+    def ns(**kw): return types.SimpleNamespace(**kw)
+    class OpenAI:
+        def __init__(self, **kwargs):
+            self.chat = ns(completions=ns(create=self._create))
+        def with_options(self, **kwargs):
+            return self
+        def _create(self, model, messages, stream=False, **kwargs):
+            parts = ["Doğru cevap ", "bağlama ", "en uygun ", "seçenektir."]
+            if stream:
+                def chunks():
+                    # ai_delay: gerçek API gecikmesine benzesin diye parça başına bekleme
+                    for p in parts:
+                        time.sleep(ai_delay / len(parts))
+                        yield ns(choices=[ns(delta=ns(content=p))])
+                return chunks()
+            return ns(choices=[ns(message=ns(content="".join(parts)))], usage=None)
+    openai.OpenAI = OpenAI
+    sys.modules["openai"] = openai
+
+    gtts = types.ModuleType("gtts")
+    class gTTS:
+        def __init__(self, text, lang="en"): self.text = text
+        def write_to_fp(self, fp): fp.write(b"ID3" + self.text.encode("utf-8"))
+    gtts.gTTS = gTTS
+    sys.modules["gtts"] = gtts
+
+
+# --- ÖLÇÜM ---
+class Recorder:
+    def __init__(self, at):
+        import perf
+        from user_state import flush_all
+        self.at = at
+        self._perf = perf
+        self._flush = flush_all
+        self.results = {}
+
+    def _counts(self):
+        reads = writes = shared = 0
+        for name, count, *_ in self._perf.process_stats.rows():
+            method = name[len("storage."):] if name.startswith("storage.") else None
+            if method in READS: reads += count
+            elif method in WRITES: writes += count
+            elif method in SHARED: shared += count
+        return reads, writes, shared
+
+    def step(self, name, action):
+        # Bekleyen arka plan yazımları önce ve sonra boşaltılır ki sayımlar bu etkileşime ait olsun
+        self._flush()
+        r0, w0, s0 = self._counts()
+        t0 = time.perf_counter()
+        action()
+        ms = (time.perf_counter() - t0) * 1000
+        self._flush()
+        r1, w1, s1 = self._counts()
+        if self.at.exception:
+            raise RuntimeError(f"{name}: {self.at.exception[0].value}")
+        self.results[name] = {"ms": round(ms, 1), "reads": r1 - r0, "writes": w1 - w0, "shared": s1 - s0}
+
+
+def button(at, label=None, key=None):
+    for b in at.button:
+        if (key and b.key == key) or (label and label in b.label):
+            return b
+    raise LookupError(label or key)
+
+
+def current_word(at, store):
+    # Alt başlıktaki "**Kelime**" -> depodaki kelime(ler)
+    text = at.subheader[-1].value.strip("*")
+    return [w for w in store.words if w.word == text]
+
+
+def run_journeys(rec):
+    from word_store import load_word_store
+    at, store = rec.at, load_word_store()
+
+    # Giriş / kayıt
+    rec.step("app.cold_start", lambda: at.run())
+    at.text_input[2].input("bench@example.com"); at.text_input[3].input("bench123")
+    rec.step("auth.register", lambda: at.button[1].click().run())
+    at.text_input[0].input("bench@example.com"); at.text_input[1].input("bench123")
+    rec.step("auth.login", lambda: at.button[0].click().run())
+
+    # Deneme Çöz
+    rec.step("exam.open", lambda: at.run())
+    radio = next(r for r in at.radio if r.label == "Cevabınız:")
+    rec.step("exam.answer", lambda: radio.set_value(radio.options[0]).run())
+    rec.step("exam.next", lambda: button(at, "Sonraki").click().run())
+    rec.step("exam.prev", lambda: button(at, "Önceki").click().run())
+    rec.step("exam.nav_jump", lambda: button(at, key="nav_btn_5").click().run())
+    def ask_ai():
+        # Tıklama + cevap kaydedilene kadar yenilemeler tek adım sayılır (iş arka planda ne zaman biterse bitsin)
+        button(at, "AI'ya Sor").click().run()
+        for _ in range(50):
+            if any("Analizi Sil" in b.label for b in at.button):
+                return
+            time.sleep(0.1)
+            at.run()
+        raise RuntimeError("AI analizi tamamlanmadı")
+    rec.step("exam.ai_ask", ask_ai)
+    rec.step("exam.ai_delete", lambda: button(at, "Analizi Sil").click().run())
+
+    # Kelime Çalış (4 etkinlik)
+    rec.step("words.open", lambda: at.sidebar.radio[0].set_value("🗂️ Kelime Çalış").run())
+    rec.step("words.flash.learned", lambda: button(at, "ÖĞRENDİM").click().run())
+    rec.step("words.flash.not_learned", lambda: button(at, "ÖĞRENMEDİM").click().run())
+    rec.step("words.flash.next", lambda: button(at, "Sonraki").click().run())
+    rec.step("words.flash.prev", lambda: button(at, "Önceki").click().run())
+    rec.step("words.flash.listen", lambda: button(at, "Telaffuzu Dinle").click().run())
+
+    rec.step("words.writing.open", lambda: at.sidebar.radio[1].set_value("Yazma Alıştırması").run())
+    rec.step("words.writing.next", lambda: button(at, "Sonraki").click().run())
+
+    rec.step("words.mc.open", lambda: at.sidebar.radio[1].set_value("Çoktan Seçmeli").run())
+    meanings = {w.meaning for w in current_word(at, store)}
+    quiz = next(r for r in at.radio if r.label == "Seçenekler:")
+    quiz.set_value(next(o for o in quiz.options if o in meanings))
+    rec.step("words.mc.check", lambda: button(at, "Kontrol Et").click().run())
+
+    rec.step("words.match.open", lambda: at.sidebar.radio[1].set_value("Kelime Eşleştirme").run())
+    pick = next(b for b in at.button if b.key and b.key.startswith("match_w_"))
+    word = pick.key[len("match_w_"):]
+    meaning = next(w.meaning for w in store.words if w.word == word)
+    rec.step("words.match.pick", lambda: pick.click().run())
+    rec.step("words.match.pair", lambda: button(at, key=f"match_m_{meaning[:20]}").click().run())
+
+    # Gramer Notları
+    rec.step("grammar.open", lambda: at.sidebar.radio[0].set_value("📖 Gramer Notları").run())
+    topic = at.sidebar.selectbox[0]
+    rec.step("grammar.topic", lambda: topic.set_value(topic.options[1]).run())
+
+
+def compare(results, budgets, time_factor):
+    failures = []
+    for name, got in results.items():
+        budget = budgets.get(name)
+        if budget is None:
+            failures.append(f"{name}: bütçe yok (--update ile ekleyin)")
+            continue
+        for field in ("reads", "writes"):
+            if got[field] > budget[field]:
+                failures.append(f"{name}: {field} {got[field]} > bütçe {budget[field]}")
+        allowed = max(budget["ms"] * time_factor, budget["ms"] + MIN_SLACK_MS)
+        if got["ms"] > allowed:
+            failures.append(f"{name}: {got['ms']:.0f} ms > izin verilen {allowed:.0f} ms")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Etkileşim başına süre ve depolama okuma/yazma bütçesi")
+    parser.add_argument("--update", action="store_true", help="ölçülen değerleri bütçe olarak kaydet")
+    parser.add_argument("--time-factor", type=float, default=3.0, help="süre bütçesine izin verilen çarpan")
+    parser.add_argument("--json", help="ölçümleri bu dosyaya yaz")
+    args = parser.parse_args()
+
+    install_fakes()
+    from streamlit.testing.v1 import AppTest
+    rec = Recorder(AppTest.from_file(APP_FILE, default_timeout=60))
+    run_journeys(rec)
+
+    print(f"{'adım':<26}{'ms':>9}{'okuma':>8}{'yazma':>8}{'ortak':>8}")
+    for name, r in rec.results.items():
+        print(f"{name:<26}{r['ms']:>9.1f}{r['reads']:>8}{r['writes']:>8}{r['shared']:>8}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rec.results, f, ensure_ascii=False, indent=2)
+
+    if args.update:
+        with open(BUDGET_FILE, "w", encoding="utf-8") as f:
+            json.dump({name: {k: v for k, v in r.items() if k != "shared"} for name, r in rec.results.items()},
+                      f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"{BUDGET_FILE} güncellendi.")
+        sys.exit(0)
+
+    with open(BUDGET_FILE, "r", encoding="utf-8") as f:
+        budgets = json.load(f)
+    failures = compare(rec.results, budgets, args.time_factor)
+    for msg in failures:
+        print(f"BÜTÇE AŞILDI: {msg}")
+    if not failures:
+        print("Tüm adımlar bütçe içinde.")
+    sys.exit(1 if failures else 0)
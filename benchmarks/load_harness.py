@@ -0,0 +1,195 @@
+# --- EŞZAMANLI OTURUM YÜK TESTİ (SIRALI ÇALIŞTIRMA) ---
+# Tek bir süreçte N adet AppTest oturumunu (thread başına bir öğrenci) çalıştırır.
+# Öğrenciler deneme çözme, flash card, yazma alıştırması ve AI analizi isteklerini karışık yapar;
+# arka uçlar interaction_budget.py'deki yerel sahtelerdir (bellek içi depolama, sahte OpenAI / gTTS).
+# Sınırlama: AppTest çalıştırma sırasında süreç genelindeki Streamlit Runtime'ını yamaladığından iki AppTest
+# aynı anda çalışamaz; betik çalıştırmaları tek bir kilitle SIRAYA girer. Bu yüzden "gecikme" yüzdelikleri
+# yapı gereği ~N x servis süresidir ve uygulama içindeki çekişme (AI kuyruğu kilidi, yazıcı kilitleri,
+# gerçek thread'lerde GIL) burada görünmez. Sonuçlar bir sürecin kaç eşzamanlı öğrenciye hizmet
+# edebileceğini SÖYLEMEZ; sadece oturum başına servis süresi, bellek (RSS) ve sıralı üst sınır olarak
+# saniyedeki yenileme sayısı karşılaştırma amaçlı raporlanır. Gerçek kapasite için `streamlit run` sunucusuna
+# eşzamanlı websocket istemcileriyle yük verilmelidir. AI işleri arka planda gerçekten paralel çalışır.
+#
+# Kullanım:  python benchmarks/load_harness.py [--sessions 1,5,10,20] [--iterations 20] [--ai-delay 2.0]
+import os
+import sys
+import gc
+import json
+import time
+import random
+import argparse
+import threading
+
+from interaction_budget import APP_FILE, install_fakes, button
+
+MODES = {"exam": "📚 Deneme Çöz", "words": "🗂️ Kelime Çalış"}
+# Eylem ağırlıkları: sınav haftasında ağırlık deneme çözmede
+ACTIONS = (("exam", 0.40), ("flash", 0.25), ("writing", 0.20), ("ai", 0.15))
+_run_lock = threading.Lock()
+
+
+def rss_mb():
+    # Linux: /proc/self/statm (sayfa cinsinden), diğerleri: en yüksek RSS
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+class Student:
+    def __init__(self, name, rng, latencies, service, errors):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file(APP_FILE, default_timeout=120)
+        self.name = name
+        self.rng = rng
+        self.latencies = latencies
+        self.service = service
+        self.errors = errors
+        self.mode = None
+        self.activity = None
+
+    def timed(self, fn):
+        t0 = time.perf_counter()
+        with _run_lock:
+            t1 = time.perf_counter()
+            fn()
+        t2 = time.perf_counter()
+        self.latencies.append((t2 - t0) * 1000)
+        self.service.append((t2 - t1) * 1000)
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].value)
+
+    def login(self):
+        at = self.at
+        self.timed(at.run)
+        email = f"{self.name}@example.com"
+        at.text_input[2].input(email); at.text_input[3].input("load1234")
+        self.timed(lambda: at.button[1].click().run())
+        at.text_input[0].input(email); at.text_input[1].input("load1234")
+        self.timed(lambda: at.button[0].click().run())
+        self.mode = MODES["exam"]
+
+    def ensure(self, mode, activity=None):
+        at = self.at
+        if self.mode != mode:
+            self.timed(lambda: at.sidebar.radio[0].set_value(mode).run())
+            self.mode = mode
+            self.activity = None
+        if activity and self.activity != activity:
+            self.timed(lambda: at.sidebar.radio[1].set_value(activity).run())
+            self.activity = activity
+
+    def exam(self):
+        at = self.at
+        self.ensure(MODES["exam"])
+        radio = next(r for r in at.radio if r.label == "Cevabınız:")
+        self.timed(lambda: radio.set_value(self.rng.choice(radio.options)).run())
+        nxt = button(at, "Sonraki")
+        if nxt.disabled:
+            self.timed(lambda: button(at, key="nav_btn_1").click().run())
+        else:
+            self.timed(lambda: nxt.click().run())
+
+    def flash(self):
+        self.ensure(MODES["words"], "Flash Card")
+        label = self.rng.choice(["ÖĞRENDİM", "ÖĞRENMEDİM", "Sonraki"])
+        self.timed(lambda: button(self.at, label).click().run())
+
+    def writing(self):
+        self.ensure(MODES["words"], "Yazma Alıştırması")
+        self.timed(lambda: button(self.at, "Sonraki").click().run())
+
+    def ai(self):
+        at = self.at
+        self.ensure(MODES["exam"])
+        navs = [b for b in at.button if b.key and b.key.startswith("nav_btn_")]
+        target = self.rng.choice(navs)
+        self.timed(lambda: target.click().run())
+        ask = next((b for b in at.button if "AI'ya Sor" in b.label and not b.disabled), None)
+        if ask is not None:
+            self.timed(lambda: ask.click().run())
+
+    def run(self, iterations):
+        try:
+            self.login()
+            names, weights = zip(*ACTIONS)
+            for _ in range(iterations):
+                getattr(self, self.rng.choices(names, weights)[0])()
+        except Exception as e:
+            self.errors.append(f"{self.name}: {e}")
+
+
+def run_level(n, iterations, seed, prefix="load"):
+    gc.collect()
+    base_rss = rss_mb()
+    latencies, service, errors = [], [], []
+    students = [Student(f"{prefix}{n}_{i}", random.Random(seed + i), latencies, service, errors) for i in range(n)]
+    threads = [threading.Thread(target=s.run, args=(iterations,), name=f"student-{i}") for i, s in enumerate(students)]
+    started = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    wall = time.perf_counter() - started
+    # Oturumlar hâlâ canlıyken ölçülür (session_state ve aynalar bellekte)
+    used = rss_mb() - base_rss
+    result = {
+        "sessions": n,
+        "reruns": len(latencies),
+        "errors": len(errors),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "service_p50_ms": round(percentile(service, 50), 1),
+        "service_p95_ms": round(percentile(service, 95), 1),
+        # Sıralı çalıştırmada saniyedeki yenileme (tek betik thread'i için üst sınır, eşzamanlı kapasite değil)
+        "serialized_reruns_per_s": round(len(latencies) / wall, 1) if wall else 0.0,
+        "serialized": True,
+        "rss_mb": round(rss_mb(), 1),
+        "mb_per_session": round(used / n, 2),
+    }
+    del students
+    return result, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Eşzamanlı oturum yük testi")
+    parser.add_argument("--sessions", default="1,5,10,20", help="virgülle ayrılmış oturum sayıları")
+    parser.add_argument("--iterations", type=int, default=20, help="oturum başına eylem sayısı")
+    parser.add_argument("--ai-delay", type=float, default=2.0, help="sahte OpenAI cevabının süresi (sn)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="sonuçları bu dosyaya yaz")
+    args = parser.parse_args()
+
+    install_fakes(ai_delay=args.ai_delay)
+    levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+    # Isınma: süreç geneli önbellekler (paket, kelime deposu, indeksler) ilk seviyenin belleğine yazılmasın
+    run_level(1, 2, args.seed, prefix="warmup")
+
+    print("Not: betik çalıştırmaları sıraya alınır; gecikme ~N x servis süresidir, kapasite ölçüsü değildir.")
+    print(f"{'N':>4}{'yenileme':>10}{'hata':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'servis p50':>12}{'servis p95':>12}"
+          f"{'sıralı yen/sn':>15}{'RSS MB':>9}{'MB/oturum':>11}")
+    results, any_errors = [], False
+    for n in levels:
+        res, errors = run_level(n, args.iterations, args.seed)
+        results.append(res)
+        print(f"{res['sessions']:>4}{res['reruns']:>10}{res['errors']:>6}{res['p50_ms']:>9}{res['p95_ms']:>9}"
+              f"{res['p99_ms']:>9}{res['service_p50_ms']:>12}{res['service_p95_ms']:>12}{res['serialized_reruns_per_s']:>15}"
+              f"{res['rss_mb']:>9}{res['mb_per_session']:>11}")
+        for msg in errors[:5]:
+            any_errors = True
+            print(f"  hata: {msg}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    sys.exit(1 if any_errors else 0)
@@ -0,0 +1,182 @@
+# --- DENEME PAKETİ DERLEYİCİ ---
+# YOKDIL_JSON_CIKTILAR içindeki tüm denemeleri tek, sürümlü ve doğrulanmış bir pakete çevirir.
+# Pasaj/soru ayrıştırma, metin normalizasyonu ve HTML üretimi burada bir kez yapılır;
+# uygulama her tıklamada dosya okumak ve regex çalıştırmak yerine hazır paketi kullanır.
+#
+# Kullanım:  python content_pack.py           -> exam_pack.json üretir
+#            python content_pack.py --check   -> sadece doğrular
+import os
+import sys
+import json
+import hashlib
+import re
+
+PACK_VERSION = 1
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+JSON_FOLDER = os.path.join(current_dir, "YOKDIL_JSON_CIKTILAR")
+PACK_FILE = os.path.join(current_dir, "exam_pack.json")
+
+
+class PackError(Exception):
+    pass
+
+
+# --- METİN YARDIMCILARI ---
+def format_text(text):
+    if not text: return ""
+    return " ".join(text.split())
+
+def format_dialogue(text):
+    # Karakter isimlerini (İsim:) bul ve öncesine iki satır boşluğu ekleyip ismi kalın yap
+    # Büyük harfle başlayan ve iki nokta ile biten kelimeleri yakalar (Alex:, Ben:, Matt: vb.)
+    formatted_text = re.sub(r'([A-Z][a-z]+:)', r'<br><br><b>\1</b>', text)
+
+    # Başta oluşabilecek fazla boşluğu temizle
+    if formatted_text.startswith('<br><br>'):
+        formatted_text = formatted_text[8:]
+
+    return formatted_text
+
+def render_passage_html(psg, q_no):
+    psg_formatted = format_text(psg)
+    # Mevcut soru numarasını içeren boşluğu bul (Örn: (17) ----) ve kırmızı vurgula
+    pattern = rf"\({q_no}\)\s*-+"
+    return re.sub(
+        pattern,
+        f"<b style='color:#FF4B4B; text-decoration:underline; font-size:20px;'>({q_no}) ----</b>",
+        psg_formatted
+    )
+
+def render_question_html(q_txt):
+    return format_text(format_dialogue(q_txt))
+
+
+# --- DERLEME ---
+def list_exam_files(folder=JSON_FOLDER):
+    return sorted([f for f in os.listdir(folder) if f.endswith(".json")])
+
+def source_hash(folder=JSON_FOLDER):
+    # Dosya adları + içerikleri üzerinden paket anahtarı
+    h = hashlib.sha256(f"v{PACK_VERSION}".encode())
+    for name in list_exam_files(folder):
+        h.update(name.encode("utf-8") + b"\0")
+        with open(os.path.join(folder, name), "rb") as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+def compile_question(q_no, raw, warnings, fname):
+    if not isinstance(raw, dict):
+        raise PackError(f"{fname} / {q_no}: soru nesnesi bekleniyordu")
+
+    psg = raw.get("passage", "") or ""
+    q_txt = raw.get("question", "") or ""
+    # Cloze sorularında soru metni boştur, pasaj yeterli
+    if not q_txt and not psg:
+        warnings.append(f"{fname} / {q_no}: soru metni ve pasaj boş")
+
+    # Pasaj ve Soru Ayrıştırma
+    if "--- PASSAGE ---" in q_txt:
+        parts = q_txt.split("--- QUESTION ---")
+        psg = parts[0].replace("--- PASSAGE ---", "").strip()
+        q_txt = parts[1].strip() if len(parts) > 1 else ""
+
+    opts = raw.get("options") or []
+    if not isinstance(opts, list) or not opts:
+        raise PackError(f"{fname} / {q_no}: şık listesi yok")
+    letters = [o.strip()[:1] for o in opts]
+    answer = raw.get("answer")
+    if answer not in letters:
+        raise PackError(f"{fname} / {q_no}: cevap '{answer}' şıklarda yok")
+
+    return {
+        "passage": psg,
+        "question": q_txt,
+        "options": opts,
+        "letters": letters,
+        "answer": answer,
+        "passage_html": render_passage_html(psg, q_no) if psg else "",
+        "question_html": render_question_html(q_txt),
+    }
+
+def compile_exam(path):
+    fname = os.path.basename(path)
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            qs = json.load(f)
+        except ValueError as e:
+            raise PackError(f"{fname}: geçersiz JSON ({e})")
+    if not isinstance(qs, dict) or not qs:
+        raise PackError(f"{fname}: soru sözlüğü bekleniyordu")
+
+    warnings = []
+    questions = {str(k): compile_question(str(k), v, warnings, fname) for k, v in qs.items()}
+    exam = {
+        "file": fname,
+        "id": fname.replace(".json", ""),
+        "keys": list(questions.keys()),
+        "questions": questions,
+    }
+    return exam, warnings
+
+def compile_pack(folder=JSON_FOLDER):
+    exams, warnings = [], []
+    for name in list_exam_files(folder):
+        exam, w = compile_exam(os.path.join(folder, name))
+        exams.append(exam)
+        warnings.extend(w)
+    pack = {
+        "version": PACK_VERSION,
+        "content_hash": source_hash(folder),
+        "exams": exams,
+    }
+    return pack, warnings
+
+def write_pack(pack, path=PACK_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(pack, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+# --- UYGULAMA TARAFI ---
+class ExamPack:
+    # Süreç boyunca paylaşılan, salt okunur paket görünümü
+    def __init__(self, pack):
+        self.version = pack["version"]
+        self.content_hash = pack["content_hash"]
+        self.exams = {e["file"]: e for e in pack["exams"]}
+        self.files = [e["file"] for e in pack["exams"]]
+
+    def exam(self, fname):
+        return self.exams.get(fname)
+
+def load_pack(folder=JSON_FOLDER, path=PACK_FILE):
+    # Derlenmiş paket güncelse onu kullan, değilse bellekte derle
+    current = source_hash(folder)
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                pack = json.load(f)
+            if pack.get("version") == PACK_VERSION and pack.get("content_hash") == current:
+                return ExamPack(pack)
+        except ValueError:
+            pass
+    pack, _ = compile_pack(folder)
+    return ExamPack(pack)
+
+
+if __name__ == "__main__":
+    check_only = "--check" in sys.argv[1:]
+    try:
+        pack, warnings = compile_pack()
+    except PackError as e:
+        print(f"HATA: {e}")
+        sys.exit(1)
+    for w in warnings:
+        print(f"Uyarı: {w}")
+    n_q = sum(len(e["keys"]) for e in pack["exams"])
+    if not check_only:
+        write_pack(pack)
+        print(f"{PACK_FILE} yazıldı.")
+    print(f"{len(pack['exams'])} deneme, {n_q} soru, hash {pack['content_hash'][:12]}")
@@ -0,0 +1,238 @@
+# --- İÇERİK DOSYALARI: SICAK YENİLEME ---
+# Deneme JSON'ları (+ .ai.jsonl yan dosyaları), yokdil_words.json ve grammar_notes.json
+# mtime/boyut ile yoklanır. Eklenen / değişen / silinen dosya için sadece ilgili parça yeniden
+# doğrulanıp indekslenir; yeni sürüm tek atamayla (ContentSnapshot) yayınlanır.
+# Oturumlar her tam sayfa çalıştırmada güncel sürümü alır, fragment yenilemeleri aynı sürümle devam eder;
+# böylece bir çalıştırmanın ortasında içerik değişmez ve yeniden başlatma gerekmez.
+# İlk sürüm ilk current() çağrısında kurulur (giriş ekranı bunu beklemez); numpy gerektiren çeldirici
+# indeksi de ancak ilk istendiğinde (çoktan seçmeli) hesaplanır.
+# Kelime kimlikleri kalıcıdır: var olan bir kimliği silen ya da başka kelimeye veren yokdil_words.json
+# değişikliği yayınlanmaz (kullanıcıların öğrenilen bitleri / tekrar kuyrukları yanlış kelimeyi gösterirdi).
+import os
+import time
+import hashlib
+import threading
+
+from content_pack import JSON_FOLDER, PACK_VERSION, PackError, ExamPack, list_exam_files, compile_exam, load_pack
+from ai_explain import SIDECAR_SUFFIX, sidecar_path, load_sidecar_explanations
+from word_store import WORDS_FILE, load_word_store, id_conflicts
+from word_search import WordSearchIndex
+from distractors import load_index as load_distractor_index
+from grammar_index import GRAMMAR_FILE, load_grammar_index
+
+WATCH_INTERVAL = float(os.getenv("YOKDIL_WATCH_INTERVAL", "2.0"))
+
+
+class ContentSnapshot:
+    __slots__ = ("version", "pack", "explanations", "words", "word_search", "grammar", "_distractors", "_lock")
+
+    def __init__(self, version, pack, explanations, words, word_search, grammar, distractors=None):
+        self.version = version
+        self.pack = pack
+        self.explanations = explanations
+        self.words = words
+        self.word_search = word_search
+        self.grammar = grammar
+        self._distractors = distractors
+        self._lock = threading.Lock()
+
+    @property
+    def distractors(self):
+        # Kelime deposu başına bir kez, ilk istendiğinde (distractors.json yoksa numpy ile hesaplanır)
+        if self._distractors is None:
+            with self._lock:
+                if self._distractors is None:
+                    self._distractors = load_distractor_index(self.words)
+        return self._distractors
+
+    def replace(self, **changes):
+        fields = {name: getattr(self, name) for name in ("pack", "explanations", "words", "word_search", "grammar")}
+        fields.update(changes)
+        # Kelimeler değişmediyse hesaplanmış çeldiriciler yeni sürüme taşınır
+        distractors = None if "words" in changes else self._distractors
+        return ContentSnapshot(self.version + 1, distractors=distractors, **fields)
+
+
+def file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def build_grammar(path=GRAMMAR_FILE):
+    # Gramer notları isteğe bağlıdır; dosya yoksa ekran uyarı gösterir
+    return load_grammar_index(path) if os.path.exists(path) else None
+
+
+def build_words(path=WORDS_FILE):
+    store = load_word_store(path)
+    return {"words": store, "word_search": WordSearchIndex(store.words)}
+
+
+class ContentWatcher:
+    def __init__(self, folder=JSON_FOLDER, words_file=WORDS_FILE, grammar_file=GRAMMAR_FILE, interval=WATCH_INTERVAL):
+        self.folder = folder
+        self.words_file = words_file
+        self.grammar_file = grammar_file
+        self.interval = interval
+        self.errors = {}
+        self.snapshot = None
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def current(self):
+        if self.snapshot is None:
+            with self._lock:
+                if self.snapshot is None:
+                    self._build()
+        return self.snapshot
+
+    def _build(self):
+        pack = load_pack(self.folder)
+        self._stamps = self._scan()
+        self._digests = {name: file_digest(os.path.join(self.folder, name)) for name in pack.files}
+        self._sidecars = {name: load_sidecar_explanations(os.path.join(self.folder, name)) for name in pack.files}
+        self.snapshot = ContentSnapshot(0, pack, self._merged_sidecars(), grammar=build_grammar(self.grammar_file),
+                                        **build_words(self.words_file))
+        if self.interval > 0:
+            threading.Thread(target=self._run, args=(self.interval,), name="content-watch", daemon=True).start()
+
+    def on_swap(self, callback):
+        self._listeners.append(callback)
+
+    def _scan(self):
+        stamps = {self.words_file: file_stamp(self.words_file), self.grammar_file: file_stamp(self.grammar_file)}
+        for name in list_exam_files(self.folder):
+            path = os.path.join(self.folder, name)
+            stamps[path] = file_stamp(path)
+            stamps[sidecar_path(path)] = file_stamp(sidecar_path(path))
+        return stamps
+
+    def _exam_path(self, path):
+        # Deneme dosyası mı, yan dosya mı? -> (deneme yolu, yan dosya mı)
+        if path.endswith(SIDECAR_SUFFIX):
+            return path[:-len(SIDECAR_SUFFIX)] + ".json", True
+        if path.endswith(".json") and os.path.normpath(os.path.dirname(path)) == os.path.normpath(self.folder):
+            return path, False
+        return None, False
+
+    def _merged_sidecars(self):
+        merged = {}
+        for explanations in self._sidecars.values():
+            merged.update(explanations)
+        return merged
+
+    def _run(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.check()
+            except Exception as e:
+                with self._lock:
+                    self.errors["watcher"] = str(e)
+
+    def current_errors(self):
+        # errors, izleme thread'i tarafından kilit altında değiştirilir; ekran kopyasını okur
+        with self._lock:
+            return dict(self.errors)
+
+    def check(self):
+        # Değişen dosyaları bulur, sadece onları yeniden işler; değişen parça adlarını döndürür
+        if self.snapshot is None:
+            return []
+        with self._lock:
+            stamps = self._scan()
+            changed = {p for p in stamps.keys() | self._stamps.keys() if stamps.get(p) != self._stamps.get(p)}
+            if not changed:
+                return []
+            snap = self.snapshot
+            updates, touched = {}, []
+
+            if self.words_file in changed:
+                try:
+                    words = build_words(self.words_file)
+                    conflicts = id_conflicts(snap.words, words["words"])
+                    if conflicts:
+                        shown = ", ".join(map(str, conflicts[:10]))
+                        raise ValueError(f"{len(conflicts)} kelime kimliği silinmiş ya da başka kelimeye geçmiş ({shown})")
+                    updates.update(words)
+                    touched.append(os.path.basename(self.words_file))
+                    self.errors.pop(self.words_file, None)
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    self.errors[self.words_file] = str(e)
+
+            if self.grammar_file in changed:
+                try:
+                    updates["grammar"] = build_grammar(self.grammar_file)
+                    touched.append(os.path.basename(self.grammar_file))
+                    self.errors.pop(self.grammar_file, None)
+                except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                    self.errors[self.grammar_file] = str(e)
+
+            exams = dict(snap.pack.exams)
+            exam_changed = sidecar_changed = False
+            for path in sorted(changed - {self.words_file, self.grammar_file}):
+                exam_path, is_sidecar = self._exam_path(path)
+                if exam_path is None:
+                    continue
+                name = os.path.basename(exam_path)
+                if is_sidecar:
+                    if name in exams:
+                        self._sidecars[name] = load_sidecar_explanations(exam_path)
+                        sidecar_changed = True
+                        touched.append(os.path.basename(path))
+                    continue
+                if stamps.get(path) is None:
+                    # Silindi
+                    if exams.pop(name, None) is not None:
+                        self._digests.pop(name, None)
+                        self._sidecars.pop(name, None)
+                        exam_changed = sidecar_changed = True
+                        touched.append(name)
+                    self.errors.pop(path, None)
+                    continue
+                try:
+                    exam, _ = compile_exam(path)
+                except (PackError, OSError) as e:
+                    # Geçersiz dosya yayınlanmaz; eski sürüm (varsa) kullanılmaya devam eder
+                    self.errors[path] = str(e)
+                    continue
+                self.errors.pop(path, None)
+                exams[name] = exam
+                self._digests[name] = file_digest(path)
+                self._sidecars[name] = load_sidecar_explanations(path)
+                exam_changed = sidecar_changed = True
+                touched.append(name)
+
+            if exam_changed:
+                updates["pack"] = ExamPack({
+                    "version": PACK_VERSION,
+                    "content_hash": self._content_hash(),
+                    "exams": [exams[name] for name in sorted(exams)],
+                })
+            if sidecar_changed:
+                updates["explanations"] = self._merged_sidecars()
+
+            self._stamps = stamps
+            if not updates:
+                return []
+            self.snapshot = snap.replace(**updates)
+
+        for callback in self._listeners:
+            callback(self.snapshot)
+        return touched
+
+    def _content_hash(self):
+        # content_pack.source_hash ile aynı anahtar, sadece değişen dosyalar yeniden okunarak
+        h = hashlib.sha256(f"v{PACK_VERSION}".encode())
+        for name in sorted(self._digests):
+            h.update(name.encode("utf-8") + b"\0")
+            h.update(self._digests[name])
+        return h.hexdigest()
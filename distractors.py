@@ -0,0 +1,125 @@
+# --- ÇELDİRİCİ İNDEKSİ (ÇOKTAN SEÇMELİ) ---
+# Her kelime için, tüm kelime listesi içinden aynı türde en "yakın" K kelime önceden seçilir:
+#   - Türkçe anlam kelimeleri ortak (anlamca yakın)
+#   - Yazılışı benzer (harf trigramları)
+#   - Eş anlamlı komşusu (eş anlamlı kümeleri örtüşüyor)
+# Benzerlikler tür başına numpy matris çarpımıyla toplu hesaplanır.
+# Adil olsun diye hedefle aynı anlam ifadesini paylaşan kelimeler (doğru cevap da olabilecekler) elenir.
+# Çalışma anında seçenek üretimi: indeksten okuma + karıştırma.
+#
+# Kullanım:  python distractors.py [--k 6]   -> distractors.json
+import os
+import sys
+import json
+import hashlib
+import argparse
+
+from word_search import fold, tokenize, trigrams
+from word_store import WORDS_FILE, load_word_store
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+INDEX_FILE = os.path.join(current_dir, "distractors.json")
+INDEX_VERSION = 1
+DEFAULT_K = 6
+# Benzerlik ağırlıkları: anlam, yazılış, eş anlamlı komşuluğu
+WEIGHTS = (0.5, 0.3, 0.2)
+
+
+def words_hash(path=WORDS_FILE):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _matrix(rows, vocab):
+    # Satır başına özellik kümesi -> L2 normlu 0/1 matris (kosinüs benzerliği = M @ M.T)
+    import numpy as np
+    m = np.zeros((len(rows), len(vocab)), dtype=np.float32)
+    for i, feats in enumerate(rows):
+        for f in feats:
+            m[i, vocab[f]] = 1.0
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return m / norms
+
+
+def _similarity(feature_sets):
+    vocab = {}
+    for feats in feature_sets:
+        for f in feats:
+            vocab.setdefault(f, len(vocab))
+    m = _matrix(feature_sets, vocab)
+    return m @ m.T
+
+
+def _overlap(left_sets, right_sets):
+    # left[a] ile right[b] ortak eleman içeriyor mu (toplu, matris çarpımıyla)
+    vocab = {}
+    for feats in left_sets + right_sets:
+        for f in feats:
+            vocab.setdefault(f, len(vocab))
+    return (_matrix(left_sets, vocab) @ _matrix(right_sets, vocab).T) > 0
+
+
+def build_index(store, k=DEFAULT_K):
+    import numpy as np
+    index = {}
+    for word_type in store.types:
+        group = [store.words[i] for i in store.type_ids[word_type] if store.words[i].word]
+        meaning_sets = [{t for m in w.means for t in tokenize(m)} for w in group]
+        spelling_sets = [trigrams(fold(w.word)) for w in group]
+        synonym_sets = [{fold(s) for s in w.synonyms} | {fold(w.word)} for w in group]
+
+        score = (WEIGHTS[0] * _similarity(meaning_sets)
+                 + WEIGHTS[1] * _similarity(spelling_sets)
+                 + WEIGHTS[2] * _similarity(synonym_sets))
+
+        # Elenecekler: kendisi, aynı anlam ifadesini paylaşanlar, doğrudan eş anlamlısı olanlar
+        phrase_sets = [{fold(m).strip() for m in w.means} | {w.meaning} for w in group]
+        name_sets = [{fold(w.word)} for w in group]
+        shared_phrase = _overlap(phrase_sets, phrase_sets)
+        synonym_of = _overlap(synonym_sets, name_sets)
+        score[shared_phrase | synonym_of | synonym_of.T] = -np.inf
+        np.fill_diagonal(score, -np.inf)
+
+        top = np.argsort(-score, axis=1)[:, :k]
+        for a, w in enumerate(group):
+            index[w.id] = [group[b].id for b in top[a] if np.isfinite(score[a, b])]
+    return index
+
+
+def write_index(index, source_hash, path=INDEX_FILE):
+    data = {"version": INDEX_VERSION, "words_hash": source_hash,
+            "distractors": {str(i): ids for i, ids in index.items()}}
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def load_index(store, path=INDEX_FILE):
+    # Dosya güncelse oku, değilse (kelime listesi değişmiş / dosya yok) bellekte kur
+    current = words_hash()
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION and data.get("words_hash") == current:
+                return {int(i): ids for i, ids in data["distractors"].items()}
+        except ValueError:
+            pass
+    return build_index(store)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Çoktan seçmeli için çeldirici indeksini üretir")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help="kelime başına saklanacak çeldirici sayısı")
+    args = parser.parse_args()
+
+    store = load_word_store()
+    index = build_index(store, args.k)
+    write_index(index, words_hash())
+    short = [i for i, ids in index.items() if len(ids) < 3]
+    print(f"{INDEX_FILE} yazıldı: {len(index)} kelime, kelime başına en fazla {args.k} çeldirici")
+    for i in short:
+        print(f"  Uyarı: {store.words[i].word} için {len(index[i])} çeldirici var")
+    sys.exit(0)
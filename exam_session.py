@@ -0,0 +1,41 @@
+# --- DENEME CEVAP TAMPONU ---
+# Şık seçimi depolamayı beklemez: cevap oturumdaki cevap haritasına yazılır, ekrandaki görünüm
+# (✅/❌ listesi dahil) bu haritadan okunur; cevap değişince sayfa yenilenir ki liste de güncellensin.
+# Depolamaya sadece değişen "answers.<soru>" alanları gider; yazımlar ortak WriteBehind ile (uid, deneme)
+# başına birleştirilir ve belirli aralıkla, başka denemeye/moda geçerken ve deneme bitirilince gönderilir.
+# Her değişiklik ayrıca ortak soru istatistiklerine (answer_stats) yeni şık +1, eski şık -1 olarak bildirilir.
+# Eski şık sadece sayaçlara gerçekten girmişse düşülür: sayılan sorular belgede "stats_counted" ile işaretlenir
+# (istatistiklerden önce verilmiş cevaplar düşülmez, sayaçlar eksiye inmez).
+
+
+class ExamAnswerLog:
+    def __init__(self, uid, deneme_id, writer, answers=None, stats=None, counted=None):
+        self.key = (uid, deneme_id)
+        self._writer = writer
+        self._stats = stats
+        # soru -> şık (yerel görünüm)
+        self.answers = dict(answers or {})
+        # Cevabı istatistik sayaçlarına girmiş sorular
+        self.counted = {q for q, v in (counted or {}).items() if v}
+
+    def record(self, q_no, letter):
+        q_no = str(q_no)
+        prev = self.answers.get(q_no)
+        if prev == letter:
+            return False
+        self.answers[q_no] = letter
+        data = {"answers": {q_no: letter}}
+        if self._stats is not None:
+            self._stats.record(self.key[1], q_no, prev if q_no in self.counted else None, letter)
+            if q_no not in self.counted:
+                self.counted.add(q_no)
+                data["stats_counted"] = {q_no: True}
+        self._writer.put(self.key, data)
+        return True
+
+    def flush(self):
+        self._writer.flush(self.key)
+
+    def score(self, questions):
+        correct = sum(1 for q, a in self.answers.items() if q in questions and questions[q]["answer"] == a)
+        return correct, len(self.answers)
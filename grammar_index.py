@@ -0,0 +1,120 @@
+# --- GRAMER NOTLARI İNDEKSİ ---
+# grammar_notes.json süreç başına bir kez okunur: konu -> bölüm -> madde.
+# Her madde ve bölümün markdown'ı önceden hazırlanır; ekranda sadece açılan bölüm çizilir.
+# title / rule / formula / examples alanları ile bölüm ve konu adları üzerinde ters indeks
+# (bölüm / konu adı o bölümün tüm maddelerine yazılır): "if clause" gibi bir kural tüm konularda
+# milisaniyeler içinde bulunur (Türkçe harf katlama kelime aramasıyla aynı).
+# Her terim önek olarak da eşleşir ("conditional" -> conditionals), basit çoğullar tekile iner ("clauses" -> clause).
+import os
+import json
+import bisect
+
+from word_search import tokenize
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+GRAMMAR_FILE = os.path.join(current_dir, "grammar_notes.json")
+FIELD_WEIGHTS = {"title": 3.0, "section": 2.5, "rule": 2.0, "formula": 2.0, "topic": 1.5, "examples": 1.0}
+# Önek ve çoğul eşleşmeleri tam eşleşmeden biraz düşük puan alır
+PREFIX_FACTOR = 0.8
+PLURAL_FACTOR = 0.9
+
+
+def render_item(item):
+    parts = []
+    if item.get("title"):
+        parts.append(f"**📍 {item['title']}**")
+    if item.get("rule"):
+        parts.append(f"> ℹ️ {item['rule']}")
+    if item.get("formula"):
+        parts.append(f"```text\n{item['formula']}\n```")
+    if item.get("examples"):
+        parts.append("  \n".join(f"→ {ex}" for ex in item["examples"]))
+    return "\n\n".join(parts)
+
+
+def singulars(tok):
+    # "clauses" -> clause, "classes" -> class; kısa kelimeler ("is", "as") dokunulmaz
+    if len(tok) <= 3 or not tok.endswith("s") or tok.endswith("ss"):
+        return ()
+    return (tok[:-1], tok[:-2]) if tok.endswith("es") else (tok[:-1],)
+
+
+class GrammarItem:
+    __slots__ = ("topic", "section", "title", "rule", "formula", "examples", "markdown")
+
+    def __init__(self, topic, section, raw):
+        self.topic = topic
+        self.section = section
+        self.title = raw.get("title")
+        self.rule = raw.get("rule")
+        self.formula = raw.get("formula")
+        self.examples = tuple(raw.get("examples") or ())
+        self.markdown = render_item(raw)
+
+
+class GrammarSection:
+    __slots__ = ("topic", "index", "name", "items", "markdown")
+
+    def __init__(self, topic, index, raw):
+        self.topic = topic
+        self.index = index
+        self.name = raw.get("topic", "Genel Kurallar")
+        self.items = tuple(GrammarItem(topic, index, it) for it in raw.get("content", []))
+        self.markdown = "\n\n---\n\n".join(it.markdown for it in self.items)
+
+
+class GrammarIndex:
+    def __init__(self, data):
+        self.topics = tuple(data.keys())
+        self.sections = {t: tuple(GrammarSection(t, i, s) for i, s in enumerate(data[t])) for t in self.topics}
+        self.items = [it for t in self.topics for s in self.sections[t] for it in s.items]
+
+        # terim -> {madde_no: en yüksek alan ağırlığı}
+        postings = {}
+        sections = {(s.topic, s.index): s for t in self.topics for s in self.sections[t]}
+        for n, it in enumerate(self.items):
+            for field, texts in (("title", (it.title,)), ("section", (sections[it.topic, it.section].name,)),
+                                 ("rule", (it.rule,)), ("formula", (it.formula,)),
+                                 ("topic", (it.topic,)), ("examples", it.examples)):
+                for text in texts:
+                    if not text:
+                        continue
+                    for tok in tokenize(text):
+                        hits = postings.setdefault(tok, {})
+                        hits[n] = max(hits.get(n, 0.0), FIELD_WEIGHTS[field])
+        self.terms = sorted(postings)
+        self.postings = [postings[t] for t in self.terms]
+
+    def _lookup(self, tok):
+        # Tam eşleşme, önek eşleşmesi ve (sorgu çoğulsa) tekil hali; madde başına en yüksek puan
+        scores = {}
+        i = bisect.bisect_left(self.terms, tok)
+        while i < len(self.terms) and self.terms[i].startswith(tok):
+            factor = 1.0 if self.terms[i] == tok else PREFIX_FACTOR
+            for n, w in self.postings[i].items():
+                scores[n] = max(scores.get(n, 0.0), w * factor)
+            i += 1
+        for stem in singulars(tok):
+            i = bisect.bisect_left(self.terms, stem)
+            if i < len(self.terms) and self.terms[i] == stem:
+                for n, w in self.postings[i].items():
+                    scores[n] = max(scores.get(n, 0.0), w * PLURAL_FACTOR)
+        return scores
+
+    def search(self, query, limit=30):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        total = None
+        for tok in tokens:
+            scores = self._lookup(tok)
+            total = scores if total is None else {n: s + scores[n] for n, s in total.items() if n in scores}
+            if not total:
+                return []
+        ranked = sorted(total.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [self.items[n] for n, _ in ranked[:limit]]
+
+
+def load_grammar_index(path=GRAMMAR_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return GrammarIndex(json.load(f))
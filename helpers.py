@@ -0,0 +1,47 @@
+# --- ORTAK YARDIMCILAR ---
+# Birden fazla modülün kullandığı küçük, özelliğe bağlı olmayan yapılar:
+# iç içe sözlük birleştirme (belge yazımları, sayaçlar) ve süreç içi LRU önbellek.
+import threading
+from collections import OrderedDict
+
+
+def deep_merge(target, data):
+    # set(..., merge=True) ile aynı mantık: iç içe sözlükler alan alan birleşir
+    for k, v in data.items():
+        if isinstance(v, dict) and isinstance(target.get(k), dict):
+            deep_merge(target[k], v)
+        elif isinstance(v, dict):
+            target[k] = deep_merge({}, v)
+        else:
+            target[k] = v
+    return target
+
+def add_counts(target, data):
+    # Sayaç birleştirme: iç içe sözlüklerdeki sayılar toplanır (üzerine yazılmaz)
+    for k, v in data.items():
+        if isinstance(v, dict):
+            add_counts(target.setdefault(k, {}), v)
+        else:
+            target[k] = target.get(k, 0) + v
+    return target
+
+
+class LRUCache:
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
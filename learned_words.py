@@ -0,0 +1,54 @@
+# --- ÖĞRENİLEN KELİMELER (BİT KÜMESİ) ---
+# Her kelimenin yokdil_words.json içindeki "id" alanı kalıcı kimliğidir (word id).
+# Öğrenilen kelimeler users/{uid} belgesinde tek bir bayt dizisi olarak tutulur:
+# 1471 kelime ~184 bayt, tek okumada gelir ve kartlar kelime başına okuma yapmadan çizilir.
+
+BITS_FIELD = "learned_bits"
+MIGRATED_FIELD = "learned_migrated"
+
+
+def word_doc_id(raw_word):
+    # Eski learned_words alt koleksiyonundaki belge adı ("Keep away / Keep off" -> "keep away _ keep off")
+    return str(raw_word).lower().strip().replace("/", "_").replace(".", "")
+
+
+class LearnedSet:
+    def __init__(self, size, blob=None):
+        self.size = size
+        self.bits = bytearray((size + 7) // 8)
+        if blob:
+            blob = bytes(blob)[:len(self.bits)]
+            self.bits[:len(blob)] = blob
+
+    def has(self, word_id):
+        return bool(self.bits[word_id >> 3] & (1 << (word_id & 7)))
+
+    def add(self, word_id):
+        self.bits[word_id >> 3] |= 1 << (word_id & 7)
+
+    def discard(self, word_id):
+        self.bits[word_id >> 3] &= ~(1 << (word_id & 7)) & 0xFF
+
+    def count(self, word_ids=None):
+        if word_ids is None:
+            return sum(bin(b).count("1") for b in self.bits)
+        return sum(1 for i in word_ids if self.has(i))
+
+    def to_bytes(self):
+        return bytes(self.bits)
+
+
+def migrate_subcollection(records, words):
+    # Eski learned_words/{doc_id} belgelerini [(doc_id, tür), ...] bir kez bit kümesine çevirir.
+    # Aynı yazılışa sahip kelimeler (ör. conduct VERB/NOUN) belgedeki "type" alanıyla ayrılır.
+    by_doc_id = {}
+    for w in words:
+        by_doc_id.setdefault(word_doc_id(w.word), []).append(w)
+
+    learned = LearnedSet(len(words))
+    for doc_id, w_type in records:
+        candidates = by_doc_id.get(doc_id, [])
+        typed = [w for w in candidates if w.type == w_type]
+        for w in typed or candidates:
+            learned.add(w.id)
+    return learned
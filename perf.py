@@ -0,0 +1,160 @@
+# --- PERFORMANS İZLEME ---
+# Hafif bir zamanlama katmanı: depolama çağrıları, dosya okumaları, AI / TTS çağrıları ve sayfa bölümleri
+# "span" olarak ölçülür; her çalıştırma (rerun / fragment rerun) için ayrı bir iz tutulur,
+# toplamlar oturum ve süreç bazında birikir. İzler JSON satırı olarak dışa aktarılabilir.
+# Kapalıyken span() paylaşılan boş bir bağlam döndürür (ek yük: tek bir bayrak kontrolü).
+#
+# Açmak için: YOKDIL_TRACE=1  (dosyaya yazmak için ayrıca YOKDIL_TRACE_FILE=perf_trace.jsonl)
+import os
+import json
+import time
+import threading
+import contextvars
+
+enabled = os.getenv("YOKDIL_TRACE") == "1"
+TRACE_FILE = os.getenv("YOKDIL_TRACE_FILE")
+_current = contextvars.ContextVar("perf_trace", default=None)
+_file_lock = threading.Lock()
+
+
+def set_enabled(flag):
+    global enabled
+    enabled = bool(flag)
+
+
+class Stats:
+    # ad -> [adet, toplam_ms, en_uzun_ms]
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.data = {}
+
+    def add(self, name, ms):
+        with self._lock:
+            row = self.data.get(name)
+            if row is None:
+                self.data[name] = [1, ms, ms]
+            else:
+                row[0] += 1
+                row[1] += ms
+                row[2] = max(row[2], ms)
+
+    def rows(self):
+        with self._lock:
+            return sorted(((name, c, total, total / c, mx) for name, (c, total, mx) in self.data.items()),
+                          key=lambda r: -r[2])
+
+
+process_stats = Stats()
+
+
+class Trace:
+    def __init__(self, label, session=None):
+        self.label = label
+        self.session = session
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.spans = []
+        self.total_ms = None
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self._t0) * 1000
+        return self
+
+    def to_dict(self):
+        return {"ts": round(self.started, 3), "session": self.session, "label": self.label,
+                "total_ms": round(self.total_ms or 0.0, 3), "spans": self.spans}
+
+
+class _NullSpan:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "_t0")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, (time.perf_counter() - self._t0) * 1000)
+        return False
+
+
+def record(name, ms):
+    # Arka plan thread'lerindeki (yazıcı, AI işçileri) ölçümler sadece süreç toplamına girer
+    process_stats.add(name, ms)
+    trace = _current.get()
+    if trace is not None:
+        trace.spans.append((name, round(ms, 3)))
+
+
+def span(name):
+    return _Span(name) if enabled else NULL_SPAN
+
+
+def current():
+    return _current.get()
+
+
+def begin(label, session=None):
+    trace = Trace(label, session)
+    return trace, _current.set(trace)
+
+
+def end(handle, session_stats=None, history=None):
+    trace, token = handle
+    trace.finish()
+    try:
+        _current.reset(token)
+    except ValueError:
+        # Kesilen çalıştırma başka bir thread'de kapatılıyor
+        pass
+    process_stats.add(f"rerun.{trace.label}", trace.total_ms)
+    if session_stats is not None:
+        session_stats.add(f"rerun.{trace.label}", trace.total_ms)
+        for name, ms in trace.spans:
+            session_stats.add(name, ms)
+    if history is not None:
+        history.append(trace)
+    if TRACE_FILE:
+        export([trace], TRACE_FILE)
+    return trace
+
+
+def to_jsonl(traces):
+    return "".join(json.dumps(t.to_dict(), ensure_ascii=False) + "\n" for t in traces)
+
+
+def export(traces, path):
+    with _file_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(to_jsonl(traces))
+
+
+class Traced:
+    # Bir nesnenin metot çağrılarını "önek.metot" adıyla ölçer (ör. storage.get_user)
+    def __init__(self, target, prefix):
+        self._target = target
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+        label = f"{self._prefix}.{name}"
+
+        def call(*args, **kwargs):
+            if not enabled:
+                return attr(*args, **kwargs)
+            with _Span(label):
+                return attr(*args, **kwargs)
+        return call
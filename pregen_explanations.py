@@ -0,0 +1,117 @@
+# --- TOPLU AI AÇIKLAMA ÜRETİMİ (ÇEVRİMDIŞI) ---
+# YOKDIL_JSON_CIKTILAR içindeki her deneme için tüm sorulara, uygulamadaki prompt ile açıklama üretir.
+# Sonuçlar her deneme dosyasının yanına "<deneme>.ai.jsonl" olarak (satır başına bir soru) yazılır;
+# dosya aynı zamanda kontrol noktasıdır: tekrar çalıştırınca başarılı sorular atlanır.
+# Uygulama bu dosyalardaki açıklamaları API çağrısı yapmadan sunar.
+#
+# Kullanım:  python pregen_explanations.py [--parallel 4] [--exam "DOSYA.json"] [--retry-failed]
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+from content_pack import JSON_FOLDER, list_exam_files, compile_exam
+from ai_explain import MODEL, PROMPT_VERSION, build_prompt, explanation_key, sidecar_path, read_sidecar
+
+# gpt-4o fiyatı, 1M token başına USD (girdi, çıktı)
+PRICE_PER_MTOK = {"gpt-4o": (2.50, 10.00)}
+
+
+def estimate_cost(usage):
+    if usage is None:
+        return 0.0
+    p_in, p_out = PRICE_PER_MTOK.get(MODEL, (0.0, 0.0))
+    return (usage.prompt_tokens * p_in + usage.completion_tokens * p_out) / 1_000_000
+
+
+def generate_one(client, q_no, q, retries=2):
+    prompt = build_prompt(q["passage"], q["question"], q["options"], q["answer"])
+    rec = {
+        "q": q_no,
+        "key": explanation_key(q["passage"], q["question"], q["options"], q["answer"]),
+        "model": MODEL,
+        "prompt_version": PROMPT_VERSION,
+    }
+    started = time.monotonic()
+    for attempt in range(retries + 1):
+        try:
+            response = client.chat.completions.create(
+                model=MODEL,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            usage = response.usage
+            rec.pop("error", None)
+            rec.update({
+                "text": response.choices[0].message.content,
+                "prompt_tokens": usage.prompt_tokens if usage else None,
+                "completion_tokens": usage.completion_tokens if usage else None,
+                "cost_usd": round(estimate_cost(usage), 6),
+                "attempts": attempt + 1,
+                "seconds": round(time.monotonic() - started, 2),
+            })
+            return rec
+        except Exception as e:
+            rec["error"] = str(e)
+            if attempt < retries:
+                time.sleep(2 ** attempt)
+    rec.update({"attempts": retries + 1, "seconds": round(time.monotonic() - started, 2)})
+    return rec
+
+
+def run_exam(client, exam_path, parallel, retry_failed):
+    exam, _ = compile_exam(exam_path)
+    path = sidecar_path(exam_path)
+    done = read_sidecar(path)
+
+    todo = []
+    for q_no in exam["keys"]:
+        q = exam["questions"][q_no]
+        rec = done.get(q_no)
+        key = explanation_key(q["passage"], q["question"], q["options"], q["answer"])
+        if rec and rec.get("key") == key and rec.get("prompt_version") == PROMPT_VERSION:
+            if rec.get("text") or not retry_failed:
+                continue
+        todo.append((q_no, q))
+
+    ok, failed, cost = 0, [], 0.0
+    with open(path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=parallel) as pool:
+        futures = [pool.submit(generate_one, client, q_no, q) for q_no, q in todo]
+        for fut in as_completed(futures):
+            rec = fut.result()
+            # Her cevap anında diske eklenir (kesilirse kaldığı yerden devam eder)
+            out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            out.flush()
+            if rec.get("text"):
+                ok += 1
+                cost += rec.get("cost_usd") or 0.0
+            else:
+                failed.append((rec["q"], rec.get("error")))
+    return len(exam["keys"]), len(todo), ok, failed, cost
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Denemeler için AI açıklamalarını önceden üretir")
+    parser.add_argument("--parallel", type=int, default=4, help="aynı anda en fazla istek sayısı")
+    parser.add_argument("--exam", action="append", help="sadece bu deneme dosyası (birden çok verilebilir)")
+    parser.add_argument("--retry-failed", action="store_true", help="daha önce hata alan soruları tekrar dene")
+    args = parser.parse_args()
+
+    load_dotenv()
+    from openai import OpenAI
+    client = OpenAI(max_retries=0)
+
+    files = args.exam or list_exam_files()
+    total_cost, any_failed = 0.0, False
+    for name in files:
+        n, n_todo, ok, failed, cost = run_exam(client, os.path.join(JSON_FOLDER, name), args.parallel, args.retry_failed)
+        total_cost += cost
+        print(f"{name}: {n} soru, {n_todo} üretilecek, {ok} başarılı, {len(failed)} hata, ${cost:.4f}")
+        for q_no, err in failed:
+            any_failed = True
+            print(f"  soru {q_no}: {err}")
+    print(f"Toplam maliyet: ${total_cost:.4f}")
+    sys.exit(1 if any_failed else 0)
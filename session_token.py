@@ -0,0 +1,109 @@
+# --- İMZALI OTURUM ANAHTARI ---
+# Girişte {uid, e-posta, verilme, bitiş} içeren HMAC-SHA256 imzalı bir anahtar çereze yazılır.
+# Sayfa yenilemelerinde anahtar yerelde doğrulanır; Firebase Auth'a sadece süresi dolunca
+# (veya kullanıcı belgesindeki sessions_valid_after ile iptal edildiyse) gidilir.
+# Auth'tan dönen hesaplar kısa süreli süreç içi önbellekte tutulur.
+import os
+import hmac
+import json
+import time
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+SECRET_FILE = os.path.join(current_dir, ".session_secret")
+COOKIE_NAME = "session_token"
+COOKIE_MAX_AGE = 2592000  # 30 gün
+# Bu süreden sonra anahtar Auth'tan yeniden doğrulanıp yenilenir
+TOKEN_TTL = 7 * 86400
+# Bu alandaki zamandan önce verilmiş anahtarlar geçersizdir (tüm oturumları kapatmak için)
+VALID_AFTER_FIELD = "sessions_valid_after"
+
+
+def load_secret():
+    # Öncelik: YOKDIL_SESSION_SECRET, yoksa ilk çalıştırmada üretilip dosyada saklanan anahtar
+    secret = os.getenv("YOKDIL_SESSION_SECRET")
+    if secret:
+        return secret.encode("utf-8")
+    try:
+        with open(SECRET_FILE, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    secret = base64.urlsafe_b64encode(os.urandom(32))
+    tmp = SECRET_FILE + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(secret)
+    os.replace(tmp, SECRET_FILE)
+    return secret
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def _sign(secret, payload):
+    return hmac.new(secret, payload.encode("ascii"), hashlib.sha256).digest()
+
+
+def issue(secret, account, ttl=TOKEN_TTL, now=None):
+    now = int(now if now is not None else time.time())
+    claims = {"uid": account["uid"], "email": account.get("email"), "iat": now, "exp": now + ttl}
+    payload = _b64(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return payload + "." + _b64(_sign(secret, payload))
+
+
+def verify(secret, token):
+    # İmza geçerliyse iddialar (süresi dolmuş olsa bile), değilse None
+    if not isinstance(token, str) or token.count(".") != 1:
+        return None
+    payload, signature = token.split(".")
+    try:
+        if not hmac.compare_digest(_unb64(signature), _sign(secret, payload)):
+            return None
+        claims = json.loads(_unb64(payload))
+    except ValueError:
+        return None
+    if not isinstance(claims, dict) or not claims.get("uid"):
+        return None
+    return claims
+
+
+def is_fresh(claims, valid_after=0, now=None):
+    now = now if now is not None else time.time()
+    return claims.get("iat", 0) >= (valid_after or 0) and claims.get("exp", 0) > now
+
+
+class TTLCache:
+    # Doğrulanmış hesaplar: anahtar -> (bitiş, değer)
+    def __init__(self, ttl=300, maxsize=4096):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
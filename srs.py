@@ -0,0 +1,96 @@
+# --- ARALIKLI TEKRAR (LEITNER) ---
+# Her kullanıcının tekrar kuyruğu users/{uid} belgesinde tek bir bayt dizisidir (srs_queue):
+# kelime başına 7 bayt (kelime_id, kutu, sıradaki_tekrar_zamanı), yığın (heap) sırasında saklanır.
+# Bellekte bir min-yığın olarak tutulur; "sıradaki kart" tüm kelimeleri taramak yerine yığının tepesidir.
+# Kutular: doğru cevap bir üst kutuya, yanlış cevap 1. kutuya; her kutunun bekleme süresi aşağıda.
+import heapq
+import struct
+import time
+
+QUEUE_FIELD = "srs_queue"
+NEW_FIELD = "srs_new"
+RECORD = struct.Struct("<HBI")
+# Kutu -> bir sonraki tekrara kadar saniye (1. kutu aynı oturumda tekrar gelir)
+INTERVALS = (0, 10 * 60, 24 * 3600, 3 * 24 * 3600, 7 * 24 * 3600, 16 * 24 * 3600, 35 * 24 * 3600)
+MAX_BOX = len(INTERVALS) - 1
+NEW_PER_DAY = 20
+
+
+def today(now=None):
+    return time.strftime("%Y-%m-%d", time.localtime(now))
+
+
+class ReviewQueue:
+    def __init__(self, blob=None):
+        # kelime_id -> (kutu, zaman); yığında eski kayıtlar tembel silinir
+        self.entries = {}
+        if blob:
+            blob = bytes(blob)
+            for off in range(0, len(blob) - len(blob) % RECORD.size, RECORD.size):
+                word_id, box, due = RECORD.unpack_from(blob, off)
+                self.entries[word_id] = (box, due)
+        self.heap = [(due, word_id) for word_id, (box, due) in self.entries.items()]
+        heapq.heapify(self.heap)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, word_id):
+        return word_id in self.entries
+
+    def box(self, word_id):
+        return self.entries.get(word_id, (0, 0))[0]
+
+    def record(self, word_id, correct, now=None):
+        now = int(now or time.time())
+        box = self.box(word_id)
+        box = min(box + 1, MAX_BOX) if correct else 1
+        due = now + INTERVALS[box]
+        self.entries[word_id] = (box, due)
+        heapq.heappush(self.heap, (due, word_id))
+        return box, due
+
+    def _clean_top(self):
+        while self.heap:
+            due, word_id = self.heap[0]
+            entry = self.entries.get(word_id)
+            if entry is not None and entry[1] == due:
+                return self.heap[0]
+            heapq.heappop(self.heap)
+        return None
+
+    def next_due(self, now=None):
+        # Vakti gelmiş en eski kelime (yoksa None); O(1) bakış, eski kayıtlar için amortize O(log n)
+        top = self._clean_top()
+        if top is not None and top[0] <= (now or time.time()):
+            return top[1]
+        return None
+
+    def next_time(self):
+        top = self._clean_top()
+        return top[0] if top else None
+
+    def due_count(self, now=None):
+        now = now or time.time()
+        return sum(1 for box, due in self.entries.values() if due <= now)
+
+    def to_bytes(self):
+        # Yığın sırasında yazılır (okurken heapify zaten sıralı bir yığınla karşılaşır)
+        heap = [(due, word_id) for word_id, (box, due) in self.entries.items()]
+        heapq.heapify(heap)
+        out = bytearray(RECORD.size * len(heap))
+        for n, (due, word_id) in enumerate(heap):
+            RECORD.pack_into(out, n * RECORD.size, word_id, self.entries[word_id][0], due)
+        return bytes(out)
+
+
+def next_new_word(queue, order, new_state, now=None, limit=NEW_PER_DAY):
+    # Günlük sınır dolmadıysa kuyrukta olmayan ilk kelime (çalışma sırasına göre)
+    day = today(now)
+    introduced = new_state.get("count", 0) if new_state.get("day") == day else 0
+    if introduced >= limit:
+        return None
+    for word_id in order:
+        if word_id not in queue:
+            return word_id
+    return None
@@ -0,0 +1,122 @@
+# --- BAŞLANGIÇ SÜRESİ RAPORU ---
+# app.py'nin en üstteki import'larını temiz bir Python sürecinde "-X importtime" ile yükler ve
+# modül başına süreyi listeler (ortak bağımlılıklar ilk yükleyen modüle yazılır).
+# Sadece ilk kullanımda yüklenen ağır modüller (openai, gtts, firebase_admin, numpy) ayrıca ölçülür.
+# Ayrıca uygulama ayrı bir süreçte AppTest ile bir kez (giriş ekranı) çalıştırılır ve proje dosyalarından
+# hangisinin ağır bir modülü doğrudan içe aktardığı izlenir (Streamlit bileşenlerinin kendi pyarrow/numpy
+# yüklemesi proje dışıdır, sayılmaz). Ağır modüllerden biri import'larla ya da ilk çalıştırmada yüklenirse
+# rapor "UYARI" verir ve 1 ile çıkar.
+# İlk çalıştırma bellek içi depolamayla yapılır (Firebase zaten arka plan thread'inde başlar).
+#
+# Kullanım:  python startup_report.py [--top 15] [--json rapor.json]
+import os
+import sys
+import ast
+import json
+import argparse
+import subprocess
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(current_dir, "app.py")
+LAZY_MODULES = ["openai", "gtts", "firebase_admin", "numpy"]
+
+FIRST_RUN = """
+import os, sys, json, builtins
+from streamlit.testing.v1 import AppTest
+root, lazy = os.path.dirname(os.path.abspath(sys.argv[1])), set(sys.argv[2].split(","))
+importers, real_import = {}, builtins.__import__
+def traced_import(name, globals=None, *args, **kwargs):
+    # Ağır modülü doğrudan içe aktaran proje dosyası; modül Streamlit tarafından zaten yüklenmiş olsa bile
+    # bu kod yolu giriş ekranında çalışmamalı (streamlit / pyarrow'un kendi yüklemeleri sayılmaz)
+    top = name.split(".")[0]
+    if top in lazy and globals:
+        path = os.path.abspath(globals.get("__file__") or "")
+        if os.path.dirname(path) == root:
+            importers.setdefault(top, globals.get("__name__"))
+    return real_import(name, globals, *args, **kwargs)
+builtins.__import__ = traced_import
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+if at.exception:
+    raise SystemExit(at.exception[0].value)
+print(json.dumps(importers))
+"""
+
+
+def startup_imports(path=APP_FILE):
+    # Modül seviyesindeki import'lar (fonksiyon içindekiler hariç), sırasıyla
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    mods = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            mods += [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            mods.append(node.module)
+    return list(dict.fromkeys(mods))
+
+
+def measure(modules):
+    # -X importtime çıktısı: "import time: self [us] | cumulative | imported package"
+    code = "\n".join(f"import {m}" for m in modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=current_dir, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import hatası")
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative, raw_name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        # Girintisiz satır üst seviye import'tur; toplam süresi ilk yükleyene yazılır
+        if len(raw_name) - len(raw_name.lstrip()) == 1:
+            timings.setdefault(raw_name.strip(), int(cumulative) / 1000)
+    return {m: timings.get(m, 0.0) for m in modules}, sum(timings.values())
+
+
+def first_run_imports(path=APP_FILE):
+    # Giriş ekranının ilk çalıştırmasında proje kodunun yüklediği ağır modüller: {modül: içe aktaran}
+    env = dict(os.environ, YOKDIL_STORAGE="memory", YOKDIL_TRACE="0")
+    proc = subprocess.run([sys.executable, "-c", FIRST_RUN, path, ",".join(LAZY_MODULES)],
+                          cwd=current_dir, capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "ilk çalıştırma hatası")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="app.py başlangıç import sürelerini raporlar")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", help="sonuçları bu dosyaya yaz")
+    args = parser.parse_args()
+
+    mods = startup_imports()
+    startup, total = measure(mods)
+    print(f"Başlangıç import'ları ({len(mods)} modül): {total:.0f} ms")
+    for name, ms in sorted(startup.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    eager = [m for m in LAZY_MODULES if any(s == m or s.startswith(m + ".") for s in mods)]
+    loaded = first_run_imports()
+    first_run = [m for m in LAZY_MODULES if m in loaded and m not in eager]
+    lazy = {}
+    print("\nİlk kullanımda yüklenenler (ayrı süreçte ölçüldü):")
+    for m in LAZY_MODULES:
+        try:
+            lazy[m] = measure([m])[1]
+            print(f"  {lazy[m]:8.1f} ms  {m}")
+        except RuntimeError as e:
+            print(f"       -     {m} ({e})")
+    for m in eager:
+        print(f"UYARI: {m} başlangıçta yükleniyor")
+    for m in first_run:
+        print(f"UYARI: {m} giriş ekranının ilk çalıştırmasında yükleniyor ({loaded[m]})")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"startup_ms": round(total, 1), "startup": startup, "lazy": lazy, "eager_lazy_modules": eager,
+                       "first_run_lazy_modules": first_run},
+                      f, ensure_ascii=False, indent=2)
+    sys.exit(1 if eager or first_run else 0)
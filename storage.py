@@ -0,0 +1,508 @@
+# --- DEPOLAMA KATMANI ---
+# Uygulamanın tüm kalıcı verisi bu arayüzden geçer:
+#   users/{uid}                     -> kullanıcı belgesi (last_location, learned_bits, ...)
+#   users/{uid}/denemeler/{deneme}  -> deneme belgesi (answers, ai_explanations)
+#   ai_cache/{anahtar}              -> kullanıcılar arası ortak AI açıklamaları
+#   answer_stats/{deneme}           -> soru zorluk özeti (+ shards/{n}: parçalı şık sayaçları)
+#   hesaplar                        -> giriş/kayıt
+# Arka uçlar: FirestoreStorage (canlı), SQLiteStorage (WAL, tek sunuculu sınıf kurulumları),
+# MemoryStorage (testler / yük denemeleri). Seçim: YOKDIL_STORAGE=firestore|sqlite|memory
+import os
+import json
+import time
+import uuid
+import base64
+import copy
+import hashlib
+import hmac
+import sqlite3
+import threading
+
+from helpers import deep_merge, add_counts
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+SQLITE_PATH = os.path.join(current_dir, "yokdil.db")
+
+
+class AccountNotFound(Exception):
+    pass
+
+class AccountExists(Exception):
+    pass
+
+class WrongPassword(Exception):
+    pass
+
+class AuthNotConfigured(Exception):
+    # Kimlik bilgisi hatası değil, kurulum eksiği (ör. FIREBASE_WEB_API_KEY yok)
+    pass
+
+# signInWithPassword hata kodları -> kimlik bilgisi hataları; diğerleri (geçersiz API anahtarı vb.) olduğu gibi yükselir
+SIGN_IN_ERRORS = {"EMAIL_NOT_FOUND": AccountNotFound, "USER_DISABLED": AccountNotFound,
+                  "INVALID_PASSWORD": WrongPassword, "INVALID_LOGIN_CREDENTIALS": WrongPassword,
+                  "INVALID_EMAIL": WrongPassword, "MISSING_PASSWORD": WrongPassword}
+
+
+def delete_path(data, path):
+    # "ai_explanations.5" gibi noktalı alan yolunu siler
+    *parents, last = path.split(".")
+    for p in parents:
+        data = data.get(p)
+        if not isinstance(data, dict):
+            return
+    data.pop(last, None)
+
+def hash_password(password, salt=None):
+    salt = salt or os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 100_000)
+    return base64.b64encode(salt + digest).decode("ascii")
+
+def check_password(stored, password):
+    salt = base64.b64decode(stored)[:16]
+    return hmac.compare_digest(hash_password(password, salt), stored)
+
+
+class Storage:
+    # --- Kullanıcı belgesi ---
+    def get_user(self, uid):
+        raise NotImplementedError
+
+    def merge_user(self, uid, data):
+        raise NotImplementedError
+
+    def watch_user(self, uid, callback):
+        # Değişiklikleri dinleyen arka uçlar abonelikten çıkma fonksiyonu döndürür
+        return None
+
+    def legacy_learned_words(self, uid):
+        # Eski learned_words alt koleksiyonu: [(belge_id, tür), ...]
+        return []
+
+    # --- Deneme belgesi ---
+    def get_exam(self, uid, deneme_id):
+        raise NotImplementedError
+
+    def merge_exam(self, uid, deneme_id, data):
+        raise NotImplementedError
+
+    def delete_exam_field(self, uid, deneme_id, path):
+        raise NotImplementedError
+
+    # --- Ortak AI önbelleği ---
+    def get_shared_explanation(self, key):
+        raise NotImplementedError
+
+    def put_shared_explanation(self, key, record):
+        raise NotImplementedError
+
+    # --- Soru istatistikleri: parçalı sayaçlar + önceden hesaplanmış özet ---
+    def increment_answer_stats(self, deneme_id, shard, deltas):
+        # deltas = {soru: {şık: +n / -n}}; sadece tek bir parça belgesine yazar
+        raise NotImplementedError
+
+    def get_answer_stat_shards(self, deneme_id):
+        raise NotImplementedError
+
+    def get_answer_stats(self, deneme_id):
+        raise NotImplementedError
+
+    def put_answer_stats(self, deneme_id, summary):
+        raise NotImplementedError
+
+    # --- Hesaplar ---
+    def get_account(self, uid):
+        raise NotImplementedError
+
+    def find_account(self, email):
+        raise NotImplementedError
+
+    def verify_password(self, email, password):
+        # Giriş: hesap + şifre doğrulaması; yanlışsa AccountNotFound / WrongPassword
+        raise NotImplementedError
+
+    def create_account(self, email, password):
+        raise NotImplementedError
+
+    def server_timestamp(self):
+        return time.time()
+
+
+# --- FIRESTORE ---
+class FirestoreStorage(Storage):
+    def __init__(self, client, web_api_key=None):
+        from firebase_admin import firestore, auth
+        self._fs = firestore
+        self._auth = auth
+        self.db = client
+        self._web_api_key = web_api_key or os.getenv("FIREBASE_WEB_API_KEY")
+
+    def _user_ref(self, uid):
+        return self.db.collection("users").document(uid)
+
+    def _exam_ref(self, uid, deneme_id):
+        return self._user_ref(uid).collection("denemeler").document(deneme_id)
+
+    def get_user(self, uid):
+        return self._user_ref(uid).get().to_dict() or {}
+
+    def merge_user(self, uid, data):
+        self._user_ref(uid).set(data, merge=True)
+
+    def watch_user(self, uid, callback):
+        def on_snapshot(docs, changes, read_time):
+            callback((docs[0].to_dict() or {}) if docs else {})
+        return self._user_ref(uid).on_snapshot(on_snapshot).unsubscribe
+
+    def legacy_learned_words(self, uid):
+        return [(doc.id, (doc.to_dict() or {}).get("type"))
+                for doc in self._user_ref(uid).collection("learned_words").stream()]
+
+    def get_exam(self, uid, deneme_id):
+        return self._exam_ref(uid, deneme_id).get().to_dict() or {}
+
+    def merge_exam(self, uid, deneme_id, data):
+        self._exam_ref(uid, deneme_id).set(data, merge=True)
+
+    def delete_exam_field(self, uid, deneme_id, path):
+        self._exam_ref(uid, deneme_id).update({path: self._fs.DELETE_FIELD})
+
+    def get_shared_explanation(self, key):
+        doc = self.db.collection("ai_cache").document(key).get()
+        return doc.to_dict() if doc.exists else None
+
+    def put_shared_explanation(self, key, record):
+        self.db.collection("ai_cache").document(key).set(record)
+
+    def _stats_ref(self, deneme_id):
+        return self.db.collection("answer_stats").document(deneme_id)
+
+    def increment_answer_stats(self, deneme_id, shard, deltas):
+        # Sunucu tarafı artırma: aynı parçaya yazan süreçler birbirini ezmez
+        data = {q: {letter: self._fs.Increment(n) for letter, n in counts.items()} for q, counts in deltas.items()}
+        self._stats_ref(deneme_id).collection("shards").document(str(shard)).set(data, merge=True)
+
+    def get_answer_stat_shards(self, deneme_id):
+        return [doc.to_dict() or {} for doc in self._stats_ref(deneme_id).collection("shards").stream()]
+
+    def get_answer_stats(self, deneme_id):
+        doc = self._stats_ref(deneme_id).get()
+        return doc.to_dict() if doc.exists else None
+
+    def put_answer_stats(self, deneme_id, summary):
+        self._stats_ref(deneme_id).set(summary)
+
+    def get_account(self, uid):
+        try:
+            user = self._auth.get_user(uid)
+        except self._auth.UserNotFoundError:
+            raise AccountNotFound(uid)
+        # Devre dışı bırakılmış hesabın oturumu yenilenmez
+        if user.disabled:
+            raise AccountNotFound(uid)
+        return {'uid': user.uid, 'email': user.email}
+
+    def find_account(self, email):
+        try:
+            user = self._auth.get_user_by_email(email)
+        except self._auth.UserNotFoundError:
+            raise AccountNotFound(email)
+        return {'uid': user.uid, 'email': user.email}
+
+    def verify_password(self, email, password):
+        # Admin SDK şifre doğrulayamaz; Firebase Auth REST (signInWithPassword) web API anahtarıyla kullanılır
+        api_key = self._web_api_key
+        if not api_key:
+            raise AuthNotConfigured("FIREBASE_WEB_API_KEY tanımlı değil (Secrets veya ortam değişkeni); şifre doğrulanamıyor")
+        import urllib.request
+        import urllib.error
+        req = urllib.request.Request(
+            "https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword?key=" + api_key,
+            data=json.dumps({"email": email, "password": password, "returnSecureToken": False}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                data = json.load(resp)
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.load(e).get("error", {}).get("message", "")
+            except ValueError:
+                message = ""
+            # "INVALID_PASSWORD : ..." gibi açıklamalı kodlar da gelir
+            error = SIGN_IN_ERRORS.get(message.split(" ")[0])
+            if error is not None:
+                raise error(email)
+            raise RuntimeError(f"Firebase Auth hatası ({e.code}): {message or e.reason}")
+        return {'uid': data['localId'], 'email': data.get('email', email)}
+
+    def create_account(self, email, password):
+        try:
+            user = self._auth.create_user(email=email, password=password)
+        except self._auth.EmailAlreadyExistsError:
+            raise AccountExists(email)
+        return {'uid': user.uid, 'email': user.email}
+
+    def server_timestamp(self):
+        return self._fs.SERVER_TIMESTAMP
+
+
+# --- BELLEK İÇİ ---
+class MemoryStorage(Storage):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.users = {}
+        self.exams = {}
+        self.shared = {}
+        self.accounts = {}
+        self.stat_shards = {}
+        self.stats = {}
+
+    def get_user(self, uid):
+        with self._lock:
+            return copy.deepcopy(self.users.get(uid, {}))
+
+    def merge_user(self, uid, data):
+        with self._lock:
+            deep_merge(self.users.setdefault(uid, {}), copy.deepcopy(data))
+
+    def get_exam(self, uid, deneme_id):
+        with self._lock:
+            return copy.deepcopy(self.exams.get((uid, deneme_id), {}))
+
+    def merge_exam(self, uid, deneme_id, data):
+        with self._lock:
+            deep_merge(self.exams.setdefault((uid, deneme_id), {}), copy.deepcopy(data))
+
+    def delete_exam_field(self, uid, deneme_id, path):
+        with self._lock:
+            delete_path(self.exams.get((uid, deneme_id), {}), path)
+
+    def get_shared_explanation(self, key):
+        with self._lock:
+            return copy.deepcopy(self.shared.get(key))
+
+    def put_shared_explanation(self, key, record):
+        with self._lock:
+            self.shared[key] = copy.deepcopy(record)
+
+    def increment_answer_stats(self, deneme_id, shard, deltas):
+        with self._lock:
+            add_counts(self.stat_shards.setdefault((deneme_id, shard), {}), deltas)
+
+    def get_answer_stat_shards(self, deneme_id):
+        with self._lock:
+            return [copy.deepcopy(d) for (d_id, _), d in self.stat_shards.items() if d_id == deneme_id]
+
+    def get_answer_stats(self, deneme_id):
+        with self._lock:
+            return copy.deepcopy(self.stats.get(deneme_id))
+
+    def put_answer_stats(self, deneme_id, summary):
+        with self._lock:
+            self.stats[deneme_id] = copy.deepcopy(summary)
+
+    def get_account(self, uid):
+        with self._lock:
+            for acc in self.accounts.values():
+                if acc['uid'] == uid:
+                    return {'uid': acc['uid'], 'email': acc['email']}
+        raise AccountNotFound(uid)
+
+    def find_account(self, email):
+        with self._lock:
+            acc = self.accounts.get(email)
+        if acc is None:
+            raise AccountNotFound(email)
+        return {'uid': acc['uid'], 'email': acc['email']}
+
+    def verify_password(self, email, password):
+        with self._lock:
+            acc = self.accounts.get(email)
+        if acc is None:
+            raise AccountNotFound(email)
+        if not check_password(acc['password'], password):
+            raise WrongPassword(email)
+        return {'uid': acc['uid'], 'email': acc['email']}
+
+    def create_account(self, email, password):
+        with self._lock:
+            if email in self.accounts:
+                raise AccountExists(email)
+            acc = {'uid': uuid.uuid4().hex, 'email': email, 'password': hash_password(password)}
+            self.accounts[email] = acc
+        return {'uid': acc['uid'], 'email': email}
+
+
+# --- SQLITE (WAL) ---
+def _encode(value):
+    # JSON'a sığmayan baytlar (learned_bits) için küçük bir sarmalayıcı
+    def default(o):
+        if isinstance(o, (bytes, bytearray)):
+            return {"__bytes__": base64.b64encode(bytes(o)).decode("ascii")}
+        raise TypeError(type(o))
+    return json.dumps(value, ensure_ascii=False, default=default)
+
+def _decode(text):
+    def hook(d):
+        if len(d) == 1 and "__bytes__" in d:
+            return base64.b64decode(d["__bytes__"])
+        return d
+    return json.loads(text, object_hook=hook) if text else {}
+
+
+class SQLiteStorage(Storage):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (uid TEXT PRIMARY KEY, data TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS exams (uid TEXT, deneme_id TEXT, data TEXT NOT NULL, PRIMARY KEY (uid, deneme_id));
+        CREATE TABLE IF NOT EXISTS shared_explanations (key TEXT PRIMARY KEY, data TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS accounts (uid TEXT PRIMARY KEY, email TEXT UNIQUE NOT NULL, password TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS answer_stat_shards (deneme_id TEXT, shard INTEGER, data TEXT NOT NULL, PRIMARY KEY (deneme_id, shard));
+        CREATE TABLE IF NOT EXISTS answer_stats (deneme_id TEXT PRIMARY KEY, data TEXT NOT NULL);
+    """
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(self.SCHEMA)
+
+    def _conn(self):
+        # Thread başına bir bağlantı; WAL sayesinde okuyucular yazarı beklemez
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _get(self, sql, args):
+        row = self._conn().execute(sql, args).fetchone()
+        return _decode(row[0]) if row else {}
+
+    def _merge(self, select_sql, upsert_sql, args, fn):
+        # Oku-birleştir-yaz tek bir IMMEDIATE işlemde (eşzamanlı yazımlar birbirini ezmesin)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(select_sql, args).fetchone()
+            data = _decode(row[0]) if row else {}
+            fn(data)
+            conn.execute(upsert_sql, args + (_encode(data),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_user(self, uid):
+        return self._get("SELECT data FROM users WHERE uid = ?", (uid,))
+
+    def merge_user(self, uid, data):
+        self._merge("SELECT data FROM users WHERE uid = ?",
+                    "INSERT OR REPLACE INTO users (uid, data) VALUES (?, ?)",
+                    (uid,), lambda d: deep_merge(d, data))
+
+    def get_exam(self, uid, deneme_id):
+        return self._get("SELECT data FROM exams WHERE uid = ? AND deneme_id = ?", (uid, deneme_id))
+
+    def merge_exam(self, uid, deneme_id, data):
+        self._merge("SELECT data FROM exams WHERE uid = ? AND deneme_id = ?",
+                    "INSERT OR REPLACE INTO exams (uid, deneme_id, data) VALUES (?, ?, ?)",
+                    (uid, deneme_id), lambda d: deep_merge(d, data))
+
+    def delete_exam_field(self, uid, deneme_id, path):
+        self._merge("SELECT data FROM exams WHERE uid = ? AND deneme_id = ?",
+                    "INSERT OR REPLACE INTO exams (uid, deneme_id, data) VALUES (?, ?, ?)",
+                    (uid, deneme_id), lambda d: delete_path(d, path))
+
+    def get_shared_explanation(self, key):
+        return self._get("SELECT data FROM shared_explanations WHERE key = ?", (key,)) or None
+
+    def put_shared_explanation(self, key, record):
+        self._conn().execute("INSERT OR REPLACE INTO shared_explanations (key, data) VALUES (?, ?)",
+                             (key, _encode(record)))
+
+    def increment_answer_stats(self, deneme_id, shard, deltas):
+        self._merge("SELECT data FROM answer_stat_shards WHERE deneme_id = ? AND shard = ?",
+                    "INSERT OR REPLACE INTO answer_stat_shards (deneme_id, shard, data) VALUES (?, ?, ?)",
+                    (deneme_id, shard), lambda d: add_counts(d, deltas))
+
+    def get_answer_stat_shards(self, deneme_id):
+        rows = self._conn().execute("SELECT data FROM answer_stat_shards WHERE deneme_id = ?", (deneme_id,)).fetchall()
+        return [_decode(row[0]) for row in rows]
+
+    def get_answer_stats(self, deneme_id):
+        return self._get("SELECT data FROM answer_stats WHERE deneme_id = ?", (deneme_id,)) or None
+
+    def put_answer_stats(self, deneme_id, summary):
+        self._conn().execute("INSERT OR REPLACE INTO answer_stats (deneme_id, data) VALUES (?, ?)",
+                             (deneme_id, _encode(summary)))
+
+    def get_account(self, uid):
+        row = self._conn().execute("SELECT uid, email FROM accounts WHERE uid = ?", (uid,)).fetchone()
+        if row is None:
+            raise AccountNotFound(uid)
+        return {'uid': row[0], 'email': row[1]}
+
+    def find_account(self, email):
+        row = self._conn().execute("SELECT uid, email FROM accounts WHERE email = ?", (email,)).fetchone()
+        if row is None:
+            raise AccountNotFound(email)
+        return {'uid': row[0], 'email': row[1]}
+
+    def verify_password(self, email, password):
+        row = self._conn().execute("SELECT uid, email, password FROM accounts WHERE email = ?", (email,)).fetchone()
+        if row is None:
+            raise AccountNotFound(email)
+        if not check_password(row[2], password):
+            raise WrongPassword(email)
+        return {'uid': row[0], 'email': row[1]}
+
+    def create_account(self, email, password):
+        uid = uuid.uuid4().hex
+        try:
+            self._conn().execute("INSERT INTO accounts (uid, email, password) VALUES (?, ?, ?)",
+                                 (uid, email, hash_password(password)))
+        except sqlite3.IntegrityError:
+            raise AccountExists(email)
+        return {'uid': uid, 'email': email}
+
+
+# --- ERTELENMİŞ BAŞLATMA ---
+class DeferredStorage:
+    # Asıl depolamayı arka planda kurar (Firebase kimlik doğrulaması ve bağlantısı saniyeler sürebilir).
+    # Sayfa bu sırada çizilir; herhangi bir metot ilk çağrıldığında kurulumun bitmesi beklenir.
+    def __init__(self, factory):
+        self._ready = threading.Event()
+        self._storage = None
+        self._error = None
+
+        def run():
+            try:
+                self._storage = factory()
+            except Exception as e:
+                self._error = e
+            finally:
+                self._ready.set()
+
+        threading.Thread(target=run, name="storage-init", daemon=True).start()
+
+    def resolve(self):
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self._storage
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+
+def open_storage(backend=None, firestore_client=None, web_api_key=None):
+    backend = backend or os.getenv("YOKDIL_STORAGE", "firestore")
+    if backend == "firestore":
+        return FirestoreStorage(firestore_client, web_api_key)
+    if backend == "sqlite":
+        return SQLiteStorage(os.getenv("YOKDIL_SQLITE_PATH", SQLITE_PATH))
+    if backend == "memory":
+        return MemoryStorage()
+    raise ValueError(f"Bilinmeyen depolama arka ucu: {backend}")
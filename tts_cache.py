@@ -0,0 +1,94 @@
+# --- TELAFFUZ SES ÖNBELLEĞİ ---
+# gTTS çıktıları (metin, dil) özetine göre diskte saklanır, önünde süreç içi LRU vardır.
+# Tüm kelimeler önceden üretildiğinde "Telaffuzu Dinle" hiç sentez yapmadan yerel baytlardan çalar.
+#
+# Kullanım:  python tts_cache.py [--workers 8]   -> yokdil_words.json içindeki tüm kelimeleri üretir
+import os
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from helpers import LRUCache
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.getenv("YOKDIL_TTS_CACHE", os.path.join(current_dir, ".tts_cache"))
+WORDS_FILE = os.path.join(current_dir, "yokdil_words.json")
+
+
+def audio_key(text, lang):
+    return hashlib.sha256(f"{lang}\0{text}".encode("utf-8")).hexdigest()
+
+def synthesize(text, lang):
+    from gtts import gTTS
+    import io
+    fp = io.BytesIO()
+    gTTS(text=text, lang=lang).write_to_fp(fp)
+    return fp.getvalue()
+
+
+class AudioCache:
+    def __init__(self, cache_dir=CACHE_DIR, maxsize=256):
+        self.cache_dir = cache_dir
+        self.local = LRUCache(maxsize)
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.mp3")
+
+    def get(self, text, lang='en'):
+        key = audio_key(text, lang)
+        data = self.local.get(key)
+        if data is not None:
+            return data
+        path = self.path(key)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+        else:
+            data = synthesize(text, lang)
+            self._store(path, data)
+        self.local.put(key, data)
+        return data
+
+    def has(self, text, lang='en'):
+        return os.path.exists(self.path(audio_key(text, lang)))
+
+    def _store(self, path, data):
+        # Yarım yazılmış dosya okunmasın diye geçici dosya + os.replace
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def prerender(self, texts, lang='en', workers=8):
+        todo = sorted({t for t in texts if t and not self.has(t, lang)})
+        done, failed = 0, []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(self._render_one, t, lang): t for t in todo}
+            for fut in as_completed(futures):
+                try:
+                    fut.result()
+                    done += 1
+                except Exception as e:
+                    failed.append((futures[fut], str(e)))
+        return len(todo), done, failed
+
+    def _render_one(self, text, lang):
+        self._store(self.path(audio_key(text, lang)), synthesize(text, lang))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Telaffuz ses önbelleğini önceden doldurur")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--lang", default="en")
+    args = parser.parse_args()
+
+    with open(WORDS_FILE, "r", encoding="utf-8") as f:
+        words = [w.get('word') for w in json.load(f)]
+    total, done, failed = AudioCache().prerender(words, args.lang, args.workers)
+    print(f"{len(words)} kelime, {total} eksik ses, {done} üretildi, {len(failed)} hata")
+    for text, err in failed:
+        print(f"  {text}: {err}")
+    sys.exit(1 if failed else 0)
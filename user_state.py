@@ -0,0 +1,138 @@
+# --- KULLANICI BELGESİ AYNASI ---
+# users/{uid} belgesinin oturum başına bellekteki kopyası.
+# Oturum açılışında tek okuma yapılır; sonrasında kendi yazdıklarımız yerelde uygulanır,
+# başka cihazdan gelen değişiklikler de depolamanın dinleyicisiyle (Firestore on_snapshot) içeri alınır.
+# Konum yazımları WriteBehind ile arka planda, birleştirilerek Firestore'a gönderilir.
+import threading
+import weakref
+import time
+import atexit
+import copy
+
+from helpers import deep_merge
+
+
+class _MirrorState:
+    # Dinleyici bu nesneyi tutar, aynanın kendisini değil (oturum kapanınca ayna çöp toplanabilsin)
+    def __init__(self, overlay_ttl):
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.data = {}
+        # Henüz sunucuya ulaşmamış olabilecek yerel yazımlar: [(zaman, veri), ...]
+        self.overlay = []
+        self.overlay_ttl = overlay_ttl
+
+    def on_change(self, data):
+        with self.lock:
+            # Eski bir anlık görüntü bekleyen yerel yazımı ezmesin
+            now = time.monotonic()
+            self.overlay = [(t, d) for t, d in self.overlay if now - t < self.overlay_ttl]
+            for _, d in self.overlay:
+                deep_merge(data, d)
+            self.data = data
+        self.ready.set()
+
+
+class UserDocMirror:
+    def __init__(self, storage, uid, watch=True, timeout=5.0, overlay_ttl=30.0):
+        self._state = _MirrorState(overlay_ttl)
+        self._unsubscribe = None
+        if watch:
+            try:
+                # Dinleyicinin ilk anlık görüntüsü açılış okumasının yerini tutar
+                self._unsubscribe = storage.watch_user(uid, self._state.on_change)
+            except Exception:
+                self._unsubscribe = None
+            if self._unsubscribe is not None:
+                weakref.finalize(self, self._unsubscribe)
+        if self._unsubscribe is None or not self._state.ready.wait(timeout):
+            data = storage.get_user(uid)
+            with self._state.lock:
+                self._state.data = data
+            self._state.ready.set()
+
+    def get(self, key, default=None):
+        with self._state.lock:
+            return self._state.data.get(key, default)
+
+    def last_location(self):
+        return dict(self.get("last_location") or {})
+
+    def apply(self, data):
+        # Kendi merge=True yazımızı yerelde de uygula
+        with self._state.lock:
+            deep_merge(self._state.data, data)
+            self._state.overlay.append((time.monotonic(), copy.deepcopy(data)))
+
+    def close(self):
+        if self._unsubscribe is not None:
+            try:
+                self._unsubscribe()
+            except Exception:
+                pass
+            self._unsubscribe = None
+
+
+# --- ARKA PLANDA BİRLEŞTİRİLEN YAZIM (WRITE-BEHIND) ---
+_writers = weakref.WeakSet()
+
+def flush_all():
+    # Süreçteki tüm yazıcıları senkron boşaltır (kapanış, ölçüm betikleri)
+    for writer in list(_writers):
+        writer.flush()
+
+
+class WriteBehind:
+    # Kullanıcı başına yalnızca son hali tutar; belirli aralıkla veya kuyruk dolunca yazar
+    def __init__(self, write_fn, interval=2.0, max_pending=100, merge=deep_merge):
+        self._write = write_fn
+        self._merge = merge
+        self._interval = interval
+        self._max_pending = max_pending
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+        _writers.add(self)
+
+    def put(self, uid, data):
+        with self._cond:
+            self._merge(self._pending.setdefault(uid, {}), data)
+            if len(self._pending) >= self._max_pending:
+                self._cond.notify()
+
+    def flush(self, uid=None):
+        # uid verilirse sadece o kullanıcı, yoksa hepsi; çağıran thread'de senkron yazar
+        with self._cond:
+            if uid is None:
+                batch, self._pending = self._pending, {}
+            else:
+                batch = {uid: self._pending.pop(uid)} if uid in self._pending else {}
+        self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        for uid, data in batch.items():
+            try:
+                self._write(uid, data)
+            except Exception:
+                # Başarısız yazımı geri koy; arada gelen daha yeni veri öncelikli
+                with self._cond:
+                    self._pending[uid] = self._merge(data, self._pending.get(uid, {}))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._pending) >= self._max_pending, timeout=self._interval)
+                batch, self._pending = self._pending, {}
+            self._write_batch(batch)
+
+
+class _SessionGuard:
+    pass
+
+def flush_on_session_end(writer, uid):
+    # Oturum durumu çöp toplandığında (oturum bitti) bekleyen yazımı gönder
+    guard = _SessionGuard()
+    weakref.finalize(guard, writer.flush, uid)
+    return guard
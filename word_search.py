@@ -0,0 +1,104 @@
+# --- KELİME ARAMA İNDEKSİ ---
+# word / means / synonyms / antonyms alanları üzerinde süreç genelinde bir kez kurulan bellek içi indeks.
+# - Türkçe büyük/küçük harf katlama (İ -> i, I -> ı), ardından ı/ş/ğ/ç/ö/ü -> i/s/g/c/o/u:
+#   "İlgi", "ilgi" ve "ilgı" aynı anahtara düşer
+# - Önek eşleşmesi: sıralı terim listesinde bisect (yazarken arama)
+# - Yazım hatası toleransı: trigram indeksi + benzerlik eşiği
+import bisect
+from array import array
+
+FIELD_WEIGHTS = {"word": 1.0, "synonyms": 0.8, "means": 0.8, "antonyms": 0.5}
+EXACT, PREFIX = 1.0, 0.8
+MIN_SIMILARITY = 0.4
+_ASCII = str.maketrans("ışğçöüâîû", "isgcouaiu")
+_SPLIT = str.maketrans({c: " " for c in ",;/()[]-'’.!?\""})
+
+
+def fold(text):
+    text = str(text).replace("İ", "i").replace("I", "ı").lower()
+    return text.translate(_ASCII)
+
+def tokenize(text):
+    return fold(text).translate(_SPLIT).split()
+
+def trigrams(token):
+    padded = f"^{token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class WordSearchIndex:
+    def __init__(self, words):
+        # terim -> [(kelime_id, alan), ...]
+        postings = {}
+        for w in words:
+            for field, values in (("word", (w.word,)), ("means", w.means),
+                                  ("synonyms", w.synonyms), ("antonyms", w.antonyms)):
+                for value in values:
+                    for tok in tokenize(value):
+                        postings.setdefault(tok, set()).add((w.id, field))
+
+        self.terms = sorted(postings)
+        self.postings = [tuple(postings[t]) for t in self.terms]
+        self.term_trigrams = [len(trigrams(t)) for t in self.terms]
+        grams = {}
+        for i, t in enumerate(self.terms):
+            for g in trigrams(t):
+                grams.setdefault(g, array('I')).append(i)
+        self.grams = grams
+
+    def _exact(self, tok):
+        i = bisect.bisect_left(self.terms, tok)
+        if i < len(self.terms) and self.terms[i] == tok:
+            return [(i, EXACT)]
+        return []
+
+    def _prefix(self, tok):
+        i = bisect.bisect_left(self.terms, tok)
+        out = []
+        while i < len(self.terms) and self.terms[i].startswith(tok):
+            out.append((i, EXACT if self.terms[i] == tok else PREFIX))
+            i += 1
+        return out
+
+    def _fuzzy(self, tok):
+        q = trigrams(tok)
+        counts = {}
+        for g in q:
+            for i in self.grams.get(g, ()):
+                counts[i] = counts.get(i, 0) + 1
+        out = []
+        for i, shared in counts.items():
+            sim = shared / (len(q) + self.term_trigrams[i] - shared)
+            if sim >= MIN_SIMILARITY:
+                out.append((i, sim * PREFIX))
+        return out
+
+    def _match_token(self, tok, prefix):
+        # Son kelime yazılırken önek, öncekiler tam; bulunamazsa (3+ harf) bulanık eşleşme
+        hits = self._prefix(tok) if prefix else self._exact(tok)
+        if not hits and len(tok) >= 3:
+            hits = self._fuzzy(tok)
+        scores = {}
+        for term_i, score in hits:
+            for word_id, field in self.postings[term_i]:
+                s = score * FIELD_WEIGHTS[field]
+                if s > scores.get(word_id, (0, None))[0]:
+                    scores[word_id] = (s, field)
+        return scores
+
+    def search(self, query, limit=20):
+        # [(kelime_id, puan, eşleşen_alan), ...] en iyi sonuç başta; tüm sorgu kelimeleri eşleşmeli
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        total = None
+        for n, tok in enumerate(tokens):
+            scores = self._match_token(tok, prefix=(n == len(tokens) - 1))
+            if total is None:
+                total = scores
+            else:
+                total = {wid: (s + scores[wid][0], f) for wid, (s, f) in total.items() if wid in scores}
+            if not total:
+                return []
+        ranked = sorted(total.items(), key=lambda kv: (-kv[1][0], kv[0]))
+        return [(wid, round(s / len(tokens), 3), f) for wid, (s, f) in ranked[:limit]]
@@ -0,0 +1,139 @@
+# --- KELİME DEPOSU (SÜREÇ GENELİ, SALT OKUNUR) ---
+# yokdil_words.json süreç başına bir kez okunur; tüm oturumlar aynı nesneyi paylaşır.
+# Oturumlarda sadece küçük tam sayı imleçler (tür, paket, kelime sırası) tutulur.
+# - Kelime kimliği: JSON'daki "id" alanı (öğrenilen bit kümesi ve tekrar kuyruğu bunu kullanır).
+#   Kimlikler kalıcıdır: araya kelime eklemek / silmek başka kelimelerin kimliğini değiştirmez,
+#   silinen kimlik boş kalır ve tekrar kullanılmaz. Yeni kelimeye kimlik: python word_store.py --assign-ids
+# - Tür başına sıralı kimlik listeleri ve 20'lik paket sınırları önceden hesaplanır
+import os
+import sys
+import json
+import random
+from array import array
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+WORDS_FILE = os.path.join(current_dir, "yokdil_words.json")
+PAGE_SIZE = 20
+SHUFFLE_SEED = 42
+
+
+class Word:
+    __slots__ = ("id", "word", "type", "means", "synonyms", "antonyms", "meaning")
+
+    def __init__(self, word_id, raw):
+        self.id = word_id
+        self.word = str(raw.get('word') or '')
+        self.type = raw.get('type')
+        self.means = tuple(raw.get('means') or ())
+        self.synonyms = tuple(raw.get('synonyms') or ())
+        self.antonyms = tuple(raw.get('antonyms') or ())
+        # Çoktan seçmeli ve eşleştirmede kullanılan birleşik anlam metni
+        self.meaning = ", ".join(self.means)
+
+
+def check_ids(raw_words):
+    seen = set()
+    for n, w in enumerate(raw_words):
+        word_id = w.get("id")
+        if not isinstance(word_id, int) or isinstance(word_id, bool) or not 0 <= word_id <= 0xFFFF:
+            raise ValueError(f"{n}. kelimenin ({w.get('word')!r}) geçerli bir 'id' alanı yok")
+        if word_id in seen:
+            raise ValueError(f"'id' {word_id} birden fazla kelimede kullanılmış")
+        seen.add(word_id)
+
+
+class WordStore:
+    def __init__(self, raw_words, page_size=PAGE_SIZE, seed=SHUFFLE_SEED):
+        check_ids(raw_words)
+        self.page_size = page_size
+        # Kimlik -> kelime; silinmiş kimliklerin yeri boş kelimeyle doldurulur
+        present = [Word(w["id"], w) for w in raw_words]
+        slots = [None] * (max((w.id for w in present), default=-1) + 1)
+        for w in present:
+            slots[w.id] = w
+        self.words = tuple(w or Word(i, {}) for i, w in enumerate(slots))
+
+        # Eski çalışma sırası: alfabetik sıralayıp sabit tohumla karıştır
+        order = sorted(present, key=lambda w: w.word)
+        random.Random(seed).shuffle(order)
+
+        # Genel çalışma sırası (aralıklı tekrarda yeni kelimeler bu sırayla gelir)
+        self.order = array('H', (w.id for w in order if w.word))
+
+        by_type = {}
+        for w in order:
+            by_type.setdefault(w.type, array('H')).append(w.id)
+        self.types = tuple(sorted(by_type))
+        self.type_ids = by_type
+
+        # Paketler: tür -> (kelime demeti, ...); boş kelimeler paket sınırı bozulmadan elenir
+        self.pages = {}
+        for t, ids in by_type.items():
+            self.pages[t] = tuple(
+                tuple(self.words[i] for i in ids[s:s + page_size] if self.words[i].word)
+                for s in range(0, len(ids), page_size)
+            )
+        # kelime_id -> (tür, paket_no, paket içi sıra); aramadan çalışma ekranına atlamak için
+        self.positions = {
+            w.id: (t, p + 1, i)
+            for t, pages in self.pages.items()
+            for p, page in enumerate(pages)
+            for i, w in enumerate(page)
+        }
+
+    def __len__(self):
+        return len(self.words)
+
+    def page_count(self, word_type):
+        return len(self.pages.get(word_type, ()))
+
+    def page(self, word_type, page_no):
+        # page_no 1'den başlar (kenar çubuğundaki "Paket" numarası)
+        pages = self.pages.get(word_type, ())
+        if 1 <= page_no <= len(pages):
+            return pages[page_no - 1]
+        return ()
+
+
+def id_conflicts(old, new):
+    # Eski depodaki bir kimlik silinmiş ya da başka kelimeye geçmişse kullanıcı verisi yanlış kelimeyi gösterir
+    conflicts = []
+    for w in old.words:
+        if not w.word:
+            continue
+        n = new.words[w.id] if w.id < len(new.words) else None
+        if n is None or (n.word, n.type) != (w.word, w.type):
+            conflicts.append(w.id)
+    return conflicts
+
+
+def load_word_store(path=WORDS_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return WordStore(json.load(f))
+
+
+def assign_ids(path=WORDS_FILE):
+    # Kimliği olmayan (yeni eklenen) kelimelere sıradaki kullanılmamış kimliği verir
+    with open(path, "r", encoding="utf-8") as f:
+        raw_words = json.load(f)
+    next_id = max((w["id"] for w in raw_words if isinstance(w.get("id"), int)), default=-1) + 1
+    added = 0
+    for n, w in enumerate(raw_words):
+        if "id" not in w:
+            raw_words[n] = dict(id=next_id, **w)
+            next_id += 1
+            added += 1
+    check_ids(raw_words)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(raw_words, indent=4, ensure_ascii=False))
+    os.replace(tmp, path)
+    return added
+
+
+if __name__ == "__main__":
+    if "--assign-ids" in sys.argv[1:]:
+        print(f"{assign_ids()} kelimeye kimlik verildi.")
+    else:
+        store = load_word_store()
+        print(f"{sum(1 for w in store.words if w.word)} kelime, en büyük kimlik {len(store) - 1}.")